@@ -7,7 +7,6 @@ and provides configurations to other components.
 """
 
 from abc import ABC, abstractmethod
-from sedtrails.application_interfaces.validator import YAMLConfigValidator
 from sedtrails.application_interfaces.find import find_value
 from typing import Dict, Any
 
@@ -87,6 +86,9 @@ class ConfigurationController(Controller):
         if self.config is None and config_file is None:
             raise ValueError('Configuration file path must be provided to the ConfigurationController.')
         else:
+            # lazy import: jsonschema and its dependencies are only needed once a config is loaded
+            from sedtrails.application_interfaces.validator import YAMLConfigValidator
+
             self.config = config_file
             validator = YAMLConfigValidator()
             self.config_data = validator.validate_yaml(config_file)
@@ -4,7 +4,6 @@ Functions to inspect metadata of SedTrails NetCDF results.
 """
 
 from pathlib import Path
-import xarray as xr
 
 
 class NetCDFInspector:
@@ -28,6 +27,8 @@ class NetCDFInspector:
             raise FileExistsError(f"Error: File '{str(self.nc_file)}' not found!")
         else:
             print(f'Inspecting NetCDF file: {str(self.nc_file)}')
+            import xarray as xr  # lazy import for performance
+
             try:
                 self.data = xr.open_dataset(self.nc_file)
             except Exception as e:
@@ -1,11 +1,21 @@
 import jsonschema
 import yaml
 import json
-from typing import Any, Dict, Optional
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from referencing import Registry
+from referencing.exceptions import NoSuchResource
+from referencing.jsonschema import DRAFT202012
 from sedtrails.exceptions import YamlParsingError, YamlOutputError, YamlValidationError
 from pathlib import Path
 from importlib.resources import files
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
 
 # Schema file names (will be resolved using importlib.resources or pkg_resources)
 ROOT_SCHEMA = 'main.schema.json'
@@ -16,7 +26,234 @@ REF_SCHEMAS = [
 ]
 
 
-class SedtrailsYamlLoader(yaml.SafeLoader):
+def _schema_file_version(schema_file: str) -> Optional[int]:
+    """
+    Returns the modification time (ns) of a packaged schema file,
+    or None when the package resource is not a file on disk.
+    """
+    try:
+        return os.stat(files('sedtrails') / 'config' / schema_file).st_mtime_ns
+    except (TypeError, OSError):
+        return None
+
+
+@lru_cache(maxsize=32)
+def _load_schema_from_file(schema_file: str, version: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Loads the JSON schema from a package resource file.
+
+    Loaded schemas are cached; ``version`` is part of the cache key so an
+    edited schema file is read again. Callers must not mutate the result.
+
+    Parameters
+    ----------
+    schema_file : str
+        The name of the JSON schema file (e.g., 'main.schema.json').
+    version : int, optional
+        The modification time of the file, see ``_schema_file_version``.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The loaded schema as a dictionary.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If the schema file is not a valid JSON file.
+    FileNotFoundError
+        If the schema file cannot be found in the package resources.
+    """
+    try:
+        # Use importlib.resources to access schema files in the package
+        config_files = files('sedtrails') / 'config'
+        schema_file_path = config_files / schema_file
+
+        # Read the schema file content in one go and parse it
+        schema_data: Any = json.loads(schema_file_path.read_bytes())
+
+    except json.JSONDecodeError as err:
+        raise err
+    except FileNotFoundError as err:
+        raise FileNotFoundError(f'Schema file {schema_file} not found in package resources') from err
+    except Exception as err:
+        raise RuntimeError(f'Error loading schema file {schema_file}: {err}') from err
+    else:
+        return schema_data
+
+
+@lru_cache(maxsize=512)
+def _parse_pointer(pointer: str) -> Tuple[str, ...]:
+    """Splits a JSON pointer into its unescaped reference tokens."""
+    return tuple(token.replace('~1', '/').replace('~0', '~') for token in pointer.lstrip('#').split('/') if token)
+
+
+def _resolve_json_pointer(document: Any, pointer: str) -> Any:
+    """
+    Resolves a JSON pointer fragment (e.g., '/$defs/some_type') within a document.
+
+    Parameters
+    ----------
+    document : Any
+        The JSON document (usually a schema dictionary).
+    pointer : str
+        The JSON pointer, with or without the leading '#'.
+
+    Returns
+    -------
+    Any
+        The value the pointer refers to.
+
+    Raises
+    ------
+    KeyError
+        If the pointer does not resolve within the document.
+    """
+    value = document
+    try:
+        for token in _parse_pointer(pointer):
+            value = value[int(token)] if type(value) is list else value[token]
+    except (KeyError, IndexError, TypeError, ValueError) as err:
+        raise KeyError(f'Cannot resolve JSON pointer {pointer}') from err
+    return value
+
+
+def _materialize_refs(node: Any, document: Dict[str, Any], registry: Registry, seen: frozenset = frozenset()) -> Any:
+    """
+    Returns a copy of a schema node where every ``$ref`` is replaced by a copy of its target.
+
+    Local references (``#/...``) are resolved within ``document``; other references are looked
+    up in the registry. Keywords next to a ``$ref`` are kept on top of the resolved target.
+    Cyclic and unresolvable references are left in place as ``$ref``.
+
+    Parameters
+    ----------
+    node : Any
+        The schema node to materialize.
+    document : Dict[str, Any]
+        The schema document that local references in ``node`` are relative to.
+    registry : Registry
+        The registry holding the external schemas.
+    seen : frozenset
+        References already being expanded on the current path, used to detect cycles.
+
+    Returns
+    -------
+    Any
+        The schema node with its references inlined.
+    """
+    if isinstance(node, list):
+        return [_materialize_refs(item, document, registry, seen) for item in node]
+    if not isinstance(node, dict):
+        return node
+
+    ref = node.get('$ref')
+    if isinstance(ref, str):
+        uri, _, fragment = ref.partition('#')
+        try:
+            target_document = registry.contents(uri) if uri else document
+            target = _resolve_json_pointer(target_document, fragment)
+            key = (id(target_document), fragment)
+        except (NoSuchResource, KeyError):
+            # Leave dangling references for the validator to report
+            key = None
+        if key is not None and key not in seen:
+            resolved = _materialize_refs(target, target_document, registry, seen | {key})
+            siblings = {k: _materialize_refs(v, document, registry, seen) for k, v in node.items() if k != '$ref'}
+            if isinstance(resolved, dict):
+                return {**resolved, **siblings}
+            return resolved
+
+    return {k: _materialize_refs(v, document, registry, seen) for k, v in node.items()}
+
+
+def _collect_refs(node: Any) -> set:
+    """Collects every ``$ref`` string used in a schema node."""
+    refs = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if isinstance(current.get('$ref'), str):
+                refs.add(current['$ref'])
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return refs
+
+
+@lru_cache(maxsize=None)
+def _compile_validator(
+    root_schema: str, ref_schemas: Tuple[str, ...], versions: Tuple[Optional[int], ...] = ()
+) -> Tuple[jsonschema.Draft202012Validator, Registry, Dict[str, Any]]:
+    """
+    Builds the SedTRAILS schema registry and validator once per set of schema files.
+
+    The compiled validator is cached at module level, so every
+    ``YAMLConfigValidator`` instance shares the same validator and registry
+    instead of re-reading the schema files and re-checking the schema.
+    The targets of the ``$ref`` used in the root schema are materialized here
+    as well, so applying defaults never has to resolve references.
+
+    Parameters
+    ----------
+    root_schema : str
+        The name of the root JSON schema file.
+    ref_schemas : Tuple[str, ...]
+        The names of the sub-schemas referenced from the root schema.
+    versions : Tuple[Optional[int], ...]
+        The versions of the root schema and sub-schemas, in that order, see
+        ``_schema_file_version``. Editing a schema file thus recompiles the validator.
+
+    Returns
+    -------
+    Tuple[jsonschema.Draft202012Validator, Registry, Dict[str, Any]]
+        The compiled validator, the registry holding the sub-schemas and the
+        materialized target of every ``$ref`` used in the root schema.
+
+    Raises
+    ------
+    ValueError
+        If the root schema is not a valid JSON schema.
+    """
+
+    schema_versions = dict(zip((root_schema, *ref_schemas), versions, strict=False))
+
+    root_schema_content = _load_schema_from_file(root_schema, schema_versions.get(root_schema))
+
+    # Register the root schema next to the sub-schemas, so references relative to the
+    # root schema resolve through the same registry the validator uses
+    resources = []
+    for schema_file in (root_schema, *ref_schemas):
+        schema_content = _load_schema_from_file(schema_file, schema_versions.get(schema_file))
+        uri = f'urn:sedtrails:config:{Path(schema_file).name}'
+        resources.append((uri, DRAFT202012.create_resource(schema_content)))
+    registry = Registry().with_resources(resources)
+
+    validator_class = jsonschema.Draft202012Validator
+    try:
+        validator_class.check_schema(root_schema_content)
+    except jsonschema.SchemaError as e:
+        raise ValueError(f'Schema validation error: {e.message}') from e
+
+    materialized_refs = {
+        ref: _materialize_refs({'$ref': ref}, root_schema_content, registry)
+        for ref in _collect_refs(root_schema_content)
+    }
+
+    return validator_class(schema=root_schema_content, registry=registry), registry, materialized_refs
+
+
+# Types of default values that can be shared instead of deep copied
+_IMMUTABLE_DEFAULT_TYPES = frozenset({str, int, float, bool, type(None)})
+
+# Tasks on the stack used by YAMLConfigValidator._apply_defaults_with_resolver
+_APPLY = 0  # apply the defaults of a schema
+_APPLY_IF_MATCH = 1  # apply the defaults of an anyOf/oneOf subschema if the data matches it
+_PROPERTIES = 2  # apply the property defaults of an object schema whose subschemas are done
+
+
+class SedtrailsYamlLoader(_SafeLoader):
     """
     Custom YAML loader that avoids converting datetime strings to datetime objects.
     A custom YAML loader is necessary because default loader always converts datetime strings to datetime objects
@@ -45,6 +282,18 @@ class YAMLConfigValidator:
         The validated configuration data as a nested dictionary.
     """
 
+    __slots__ = (
+        'config',
+        '_applied_defaults',
+        '_schema_yaml',
+        '__registry',
+        '__resolver',
+        '__materialized_refs',
+        '__defaults_plans',
+        '__subschema_validators',
+        '__validator',
+    )
+
     def __init__(self) -> None:
         """
         Initialize a validator to validate SedTRAILS configuration files written in YAML.
@@ -53,51 +302,18 @@ class YAMLConfigValidator:
 
         self.config: Dict[str, Any] = {}
         self._applied_defaults: bool = False
+        self._schema_yaml: Optional[str] = None
         self.__registry = None
+        self.__resolver = None
+        self.__materialized_refs: Dict[str, Any] = {}
+        self.__defaults_plans: Dict[int, Tuple[Dict[str, Any], Tuple]] = {}
+        self.__subschema_validators: Dict[int, Tuple[Dict[str, Any], jsonschema.Draft202012Validator]] = {}
         self.__validator = self._validator()
 
-    def _load_schema_from_file(self, schema_file: str) -> Dict[str, Any]:
-        """
-        Loads the JSON schema from a package resource file.
-
-        Parameters
-        ----------
-        schema_file : str
-            The name of the JSON schema file (e.g., 'main.schema.json').
-
-        Returns
-        -------
-        Dict[str, Any]
-            The loaded schema as a dictionary.
-
-        Raises
-        ------
-        json.JSONDecodeError
-            If the schema file is not a valid JSON file.
-        FileNotFoundError
-            If the schema file cannot be found in the package resources.
-        """
-        try:
-            # Use importlib.resources to access schema files in the package
-            config_files = files('sedtrails') / 'config'
-            schema_file_path = config_files / schema_file
-
-            # Read the schema file content
-            with schema_file_path.open('r', encoding='utf-8') as f:
-                schema_data: Any = json.load(f)
-
-        except json.JSONDecodeError as err:
-            raise err
-        except FileNotFoundError as err:
-            raise FileNotFoundError(f'Schema file {schema_file} not found in package resources') from err
-        except Exception as err:
-            raise RuntimeError(f'Error loading schema file {schema_file}: {err}') from err
-        else:
-            return schema_data
-
     def _apply_defaults(self, schema_content: Dict[str, Any], config_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Recursively applies default values from the schema to the data dictionary.
+        Applies default values from the schema to the data dictionary, walking nested
+        objects and arrays.
         If a default is specified as a dictionary with "$ref" and transformation keys,
         it is computed accordingly.
 
@@ -125,83 +341,159 @@ class YAMLConfigValidator:
     ) -> Dict[str, Any]:
         """
         Internal method that applies defaults with access to the schema resolver.
-        """
-        schema_type = schema_content.get('type')
 
-        # Handle $ref references
-        if '$ref' in schema_content:
-            # Resolve the reference using the validator's schema resolver
-            try:
-                resolver = self.__registry.resolver()
-                resolved = resolver.lookup(schema_content['$ref'])
-                resolved_schema = resolved.contents
-                return self._apply_defaults_with_resolver(resolved_schema, config_data, validator)
-            except Exception as e:
-                print(f'Warning: Could not resolve $ref {schema_content["$ref"]}: {e}')
-                return config_data
-
-        if schema_type == 'object' and isinstance(config_data, dict):
-            properties = schema_content.get('properties', {})
-
-            # Handle allOf, anyOf, oneOf schemas
-            for conditional_key in ['allOf', 'anyOf', 'oneOf']:
-                if conditional_key in schema_content:
-                    for sub_schema in schema_content[conditional_key]:
-                        if conditional_key == 'allOf' or self._schema_matches(sub_schema, config_data, validator):
-                            config_data = self._apply_defaults_with_resolver(sub_schema, config_data, validator)
-
-            for key, prop_schema in properties.items():
-                if key not in config_data:
-                    # Create missing property with default value
-                    if 'default' in prop_schema:
-                        config_data[key] = self._deep_copy_default(prop_schema['default'])
-                    elif prop_schema.get('type') == 'object':
-                        # Create empty object and apply defaults recursively
-                        config_data[key] = {}
-                        config_data[key] = self._apply_defaults_with_resolver(prop_schema, config_data[key], validator)
-                    elif (
-                        prop_schema.get('type') == 'array'
-                        and 'items' in prop_schema
-                        and 'default' in prop_schema['items']
-                    ):
-                        # Handle arrays with default items
-                        config_data[key] = []
-                else:
-                    # Property exists, apply defaults recursively if it's an object or array
-                    if prop_schema.get('type') == 'object' and isinstance(config_data[key], dict):
-                        config_data[key] = self._apply_defaults_with_resolver(prop_schema, config_data[key], validator)
-                    elif prop_schema.get('type') == 'array' and isinstance(config_data[key], list):
-                        item_schema = prop_schema.get('items', {})
-                        for i, item in enumerate(config_data[key]):
-                            if isinstance(item, dict) and item_schema.get('type') == 'object':
-                                config_data[key][i] = self._apply_defaults_with_resolver(item_schema, item, validator)
-
-        elif schema_type == 'array' and isinstance(config_data, list):
-            item_schema = schema_content.get('items', {})
-            for i, item in enumerate(config_data):
-                if isinstance(item, dict) and item_schema.get('type') == 'object':
-                    config_data[i] = self._apply_defaults_with_resolver(item_schema, item, validator)
+        The schema is walked with an explicit stack of ``(schema, data, task)`` entries
+        instead of recursion. Entries are processed depth-first in schema order, so
+        anyOf/oneOf conditions see the same data as a recursive walk would.
+        """
+        stack = [(schema_content, config_data, _APPLY)]
+        # Local bindings for the hot loop
+        pop = stack.pop
+        push = stack.append
+        extend = stack.extend
+        defaults_plan = self._defaults_plan
+        copy_default = self._deep_copy_default
+        _dict, _list = dict, list
+
+        while stack:
+            schema, data, task = pop()
+
+            if task == _APPLY_IF_MATCH and not self._schema_matches(schema, data, validator):
+                continue
+
+            plan = defaults_plan(schema)
+            kind = plan[0]
+
+            if kind == 'object':
+                # Configuration data comes from the YAML loader, so plain dicts and lists
+                if type(data) is not _dict:
+                    continue
+                _, conditionals, properties = plan
+                if task != _PROPERTIES and conditionals:
+                    # Apply allOf, anyOf, oneOf subschemas first, then come back for the properties
+                    push((schema, data, _PROPERTIES))
+                    for applies_always, sub_schema in reversed(conditionals):
+                        push((sub_schema, data, _APPLY if applies_always else _APPLY_IF_MATCH))
+                    continue
+
+                children = []
+                for key, prop_schema, has_default, prop_type, item_schema, has_default_items in properties:
+                    try:
+                        value = data[key]
+                    except KeyError:
+                        # Create missing property with default value
+                        if has_default:
+                            data[key] = copy_default(prop_schema['default'])
+                        elif prop_type == 'object':
+                            # Create empty object and apply defaults to it
+                            data[key] = value = {}
+                            children.append((prop_schema, value, _APPLY))
+                        elif has_default_items:
+                            # Handle arrays with default items
+                            data[key] = []
+                        continue
+
+                    # Property exists, apply defaults if it's an object or array
+                    if prop_type == 'object':
+                        if type(value) is _dict:
+                            children.append((prop_schema, value, _APPLY))
+                    elif item_schema is not None and prop_type == 'array' and type(value) is _list:
+                        children.extend((item_schema, item, _APPLY) for item in value if type(item) is _dict)
+                extend(reversed(children))
+
+            elif kind == 'array':
+                if plan[1] is not None and type(data) is _list:
+                    extend((plan[1], item, _APPLY) for item in reversed(data) if type(item) is _dict)
+
+            elif kind == '$ref':
+                # References used in the SedTRAILS schema are materialized when the
+                # validator is compiled; anything else goes through the resolver.
+                resolved_schema = self.__materialized_refs.get(plan[1])
+                if resolved_schema is None:
+                    try:
+                        resolved_schema = self.__resolver.lookup(plan[1]).contents
+                    except Exception as e:
+                        print(f'Warning: Could not resolve $ref {plan[1]}: {e}')
+                        continue
+                push((resolved_schema, data, _APPLY))
 
         return config_data
 
+    def _defaults_plan(self, schema: Dict[str, Any]) -> Tuple:
+        """
+        Returns the defaults plan of a (sub)schema, building it on first use.
+
+        The plan holds everything ``_apply_defaults`` needs from a schema node, so the
+        keyword lookups are done once per node rather than once per configuration:
+
+        - ``('$ref', ref)`` for references,
+        - ``('object', conditionals, properties)`` for objects, where ``conditionals``
+          lists ``(is_allOf, subschema)`` pairs and ``properties`` lists
+          ``(key, schema, has_default, type, object_item_schema, has_default_items)``,
+        - ``('array', object_item_schema)`` for arrays,
+        - ``(None,)`` for anything else.
+        """
+        # The schema is stored alongside its plan so a recycled id() never returns a stale entry
+        cached = self.__defaults_plans.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+
+        schema_type = schema.get('type')
+        if '$ref' in schema:
+            plan = ('$ref', schema['$ref'])
+        elif schema_type == 'object':
+            conditionals = tuple(
+                (conditional_key == 'allOf', sub_schema)
+                for conditional_key in ('allOf', 'anyOf', 'oneOf')
+                if conditional_key in schema
+                for sub_schema in schema[conditional_key]
+            )
+            properties = []
+            for key, prop_schema in schema.get('properties', {}).items():
+                prop_type = prop_schema.get('type')
+                item_schema = prop_schema.get('items', {})
+                properties.append(
+                    (
+                        key,
+                        prop_schema,
+                        'default' in prop_schema,
+                        prop_type,
+                        item_schema if item_schema.get('type') == 'object' else None,
+                        prop_type == 'array' and 'items' in prop_schema and 'default' in prop_schema['items'],
+                    )
+                )
+            plan = ('object', conditionals, tuple(properties))
+        elif schema_type == 'array':
+            item_schema = schema.get('items', {})
+            plan = ('array', item_schema if item_schema.get('type') == 'object' else None)
+        else:
+            plan = (None,)
+
+        self.__defaults_plans[id(schema)] = (schema, plan)
+        return plan
+
     def _schema_matches(
         self, schema: Dict[str, Any], data: Dict[str, Any], validator: jsonschema.Draft202012Validator
     ) -> bool:
         """
         Check if data matches a schema (used for anyOf/oneOf conditions).
         """
-        try:
-            # Create a temporary validator for this schema
-            temp_validator = jsonschema.Draft202012Validator(schema, registry=self.__registry)
-            temp_validator.validate(data)
-            return True
-        except jsonschema.ValidationError:
-            return False
+        # Reuse the validator built for this subschema, if any. The schema itself is
+        # stored alongside the validator so a recycled id() never returns a stale entry.
+        cached = self.__subschema_validators.get(id(schema))
+        if cached is None or cached[0] is not schema:
+            cached = (schema, jsonschema.Draft202012Validator(schema, registry=self.__registry))
+            self.__subschema_validators[id(schema)] = cached
+        return cached[1].is_valid(data)
 
     def _deep_copy_default(self, value: Any) -> Any:
         """
         Deep copy default values to avoid reference issues.
+        Immutable defaults (strings, numbers, booleans, None) are shared as they are.
         """
+        if type(value) in _IMMUTABLE_DEFAULT_TYPES:
+            return value
+
         import copy
 
         return copy.deepcopy(value)
@@ -221,7 +513,8 @@ class YAMLConfigValidator:
 
     def _validator(self) -> jsonschema.Draft202012Validator:
         """
-        Creates a JSON schema validator using the SedTRAILS schema.
+        Returns the JSON schema validator for the SedTRAILS schema.
+        The validator is compiled once and shared by all instances.
 
         Returns
         -------
@@ -231,27 +524,12 @@ class YAMLConfigValidator:
 
         """
 
-        from referencing import Registry, Resource
-        from referencing.jsonschema import DRAFT202012
-
-        registry = Registry()
-
-        root_schema_content = self._load_schema_from_file(ROOT_SCHEMA)
-
-        for schema_file in REF_SCHEMAS:
-            schema_content = self._load_schema_from_file(schema_file)
-            resource = Resource(contents=schema_content, specification=DRAFT202012)
-            uri = f'urn:sedtrails:config:{Path(schema_file).name}'
-            registry = registry.with_resource(uri=uri, resource=resource)
-
+        ref_schemas = tuple(REF_SCHEMAS)
+        versions = tuple(_schema_file_version(schema_file) for schema_file in (ROOT_SCHEMA, *ref_schemas))
+        validator, registry, materialized_refs = _compile_validator(ROOT_SCHEMA, ref_schemas, versions)
         self.__registry = registry
-
-        validator_class = jsonschema.Draft202012Validator
-        validator = validator_class(schema=root_schema_content, registry=registry)
-        try:
-            validator.check_schema(root_schema_content)
-        except jsonschema.SchemaError as e:
-            raise ValueError(f'Schema validation error: {e.message}') from e
+        self.__materialized_refs = materialized_refs
+        self.__resolver = registry.resolver(base_uri=validator.schema.get('$id', ''))
 
         return validator
 
@@ -282,17 +560,15 @@ class YAMLConfigValidator:
         """
 
         try:
-            with open(yml_filepath, 'r') as f:
-                yaml_data: Dict[str, Any] = yaml.load(f, Loader=SedtrailsYamlLoader)
+            yaml_data: Dict[str, Any] = yaml.load(Path(yml_filepath).read_bytes(), Loader=SedtrailsYamlLoader)
         except Exception as e:
             raise YamlParsingError(f'Error reading YAML file: {e}') from e
 
         # Validate the YAML data against the schema
-        try:
-            # jsonschema.validate(instance=yaml_data, schema=self.schema_content, resolver=new_resolver)
-            self.__validator.validate(yaml_data)
-        except jsonschema.ValidationError as e:
-            raise YamlValidationError(f'YAML config validation error: {e.message}') from e
+        # Only the first error is reported, so stop iterating as soon as one is found
+        first_error = next(self.__validator.iter_errors(yaml_data), None)
+        if first_error is not None:
+            raise YamlValidationError(f'YAML config validation error: {first_error.message}') from first_error
 
         # apply default values from the schema
         if self._applied_defaults:  # skip applying defaults if already done
@@ -300,7 +576,7 @@ class YAMLConfigValidator:
 
         # Apply default values from the schema
         try:
-            config_with_defaults = self._apply_defaults(self.schema_content, yaml_data.copy())
+            config_with_defaults = self._apply_defaults(self.schema_content, yaml_data)
             self.config = config_with_defaults
             self._applied_defaults = True
         except Exception as e:
@@ -328,7 +604,10 @@ class YAMLConfigValidator:
         YamlOutputError
             If there is an error while writing the schema to the file.
         """
-        schema_yaml: str = yaml.dump(self.schema_content, sort_keys=False)
+        # The schema does not change after loading, so serialize it only once
+        if self._schema_yaml is None:
+            self._schema_yaml = yaml.dump(self.schema_content, Dumper=_SafeDumper, sort_keys=False)
+        schema_yaml: str = self._schema_yaml
         if output_file:
             try:
                 with open(output_file, 'w') as f:
@@ -361,7 +640,7 @@ class YAMLConfigValidator:
             self._apply_defaults(self.schema_content, self.config)
         print(f'Applied defaults to config: {self.config}')
 
-        config_yaml: str = yaml.dump(self.config, sort_keys=False)
+        config_yaml: str = yaml.dump(self.config, Dumper=_SafeDumper, sort_keys=False)
 
         print(f'config yaml: {config_yaml}')
         if output_file:
@@ -398,7 +677,12 @@ class YAMLConfigValidator:
 
             # Convert to YAML
             config_yaml = yaml.dump(
-                self.config, default_flow_style=False, sort_keys=False, indent=2, allow_unicode=True
+                self.config,
+                Dumper=_SafeDumper,
+                default_flow_style=False,
+                sort_keys=False,
+                indent=2,
+                allow_unicode=True,
             )
 
             # Write to file with header
@@ -1,7 +1,8 @@
 from sedtrails.data_manager.simulation_buffer import SimulationDataBuffer
 from sedtrails.data_manager.memory_manager import MemoryManager
 from sedtrails.data_manager.netcdf_writer import NetCDFWriter
-from sedtrails.data_manager.xarray_dataset import collect_timestep_data
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 import logging
 import numpy as np
 
@@ -12,6 +13,41 @@ NODE_Y = np.array([0, 0, 1, 1])
 FACE_NODE_CONNECTIVITY = np.array([[0, 1, 2, 3]])
 FILL_VALUE = -1
 
+# Formats of the intermediate buffer chunks
+OUTPUT_FORMATS = ('netcdf', 'netcdf_append', 'zarr')
+ZARR_STORE_NAME = '.sim_buffer.zarr'
+APPEND_FILE_NAME = '.sim_buffer.nc'
+# Maximum number of threads used to delete chunk files
+CLEANUP_WORKERS = 8
+
+
+def _unlink_chunk_file(chunk_file):
+    """
+    Delete a chunk file, logging instead of raising if it cannot be deleted.
+    """
+
+    try:
+        chunk_file.unlink()  # Delete the file
+    except FileNotFoundError:
+        # File already deleted, ignore
+        pass
+    except Exception as e:
+        # Log warning but don't fail the operation
+        logging.warning(f'Could not delete chunk file {chunk_file}: {e}')
+
+
+def _write_with_hdf5_lock(write, *args):
+    """
+    Call ``write(*args)`` while holding xarray's HDF5 lock. The netCDF4/HDF5 libraries are not
+    thread-safe, and while a chunk is written in the background the main thread may be reading
+    or writing NetCDF files through xarray, which takes the same lock.
+    """
+
+    from xarray.backends.locks import HDF5_LOCK  # lazy import for performance
+
+    with HDF5_LOCK:
+        return write(*args)
+
 
 class DataManager:
     """
@@ -41,10 +77,12 @@ class DataManager:
     data_manager.collect_timestep_data(dataset, populations, timestep, current_time)
 
     # Write final results (using composition)
-    output_path = data_manager.writer.write(dataset, filename, trim_to_actual_timesteps=True)
+    output_path = data_manager.writer.write(
+        dataset, filename, trim_to_actual_timesteps=True, actual_timesteps=n_timesteps_written
+    )
     """
 
-    def __init__(self, output_dir: str, max_bytes=512 * 1024 * 1024):
+    def __init__(self, output_dir: str, max_bytes=512 * 1024 * 1024, output_format='netcdf'):
         """
         Initialize the DataManager with a output data directory.
         All other resources are initialized lazily.
@@ -66,44 +104,110 @@ class DataManager:
             Writer instance for outputting NetCDF files.
         _mesh_info : tuple or None
             Mesh information (node_x, node_y, face_node_connectivity, fill_value).
+        _write_executor : ThreadPoolExecutor or None
+            Single-thread executor writing flushed chunks in the background, created on first use.
+        _write_futures : list of Future
+            Pending background chunk write; at most one is in flight.
+        _append_file : NetCDFAppendFile or None
+            The open intermediate file of the 'netcdf_append' output format.
+        _append_file_created : bool
+            Whether the intermediate file of the 'netcdf_append' output format was created by this
+            manager, so it is reopened for appending after merge() or dump(merge=False) closed it.
         file_counter : int
             Counter for naming output files uniquely.
+        output_format : str
+            Format of the intermediate chunks: 'netcdf' writes one .sim_buffer_<i>.nc file per
+            buffer flush. 'netcdf_append' appends every flush along time to a single .sim_buffer.nc
+            file that is kept open until dump(), 'zarr' to a single .sim_buffer.zarr store; both
+            need no merge of chunk files. 'zarr' requires the zarr package.
         """
 
-        self.data_buffer = SimulationDataBuffer()
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f'Unknown output format {output_format!r}, expected one of {OUTPUT_FORMATS}.')
+        if output_format == 'zarr' and importlib.util.find_spec('zarr') is None:
+            raise ImportError("The 'zarr' output format requires the zarr package: pip install sedtrails[zarr]")
+
+        self.output_format = output_format
+        # The buffer is flushed once it holds more than max_bytes, i.e. more than _flush_rows data points,
+        # so it never needs to grow past that
+        self._flush_rows = max_bytes // SimulationDataBuffer.ROW_NBYTES
+        self.data_buffer = SimulationDataBuffer(max_capacity=self._flush_rows + 1)
         self.memory_manager = MemoryManager(max_bytes=max_bytes)
         self.writer = NetCDFWriter(output_dir)
         self.output_dir = self.writer.output_dir  # Make sure we are using the same results directory
         self._mesh_info = None
         self.file_counter = 0
+        # Chunks flushed because of the memory limit are written by a single background thread
+        self._write_executor = None
+        self._write_futures = []
+        self._append_file = None
+        self._append_file_created = False
+
+    @property
+    def zarr_store(self):
+        """
+        Path to the Zarr store the buffer is appended to when output_format is 'zarr'.
+        """
+
+        return self.output_dir / ZARR_STORE_NAME
+
+    @property
+    def append_file_path(self):
+        """
+        Path to the NetCDF file the buffer is appended to when output_format is 'netcdf_append'.
+        """
+
+        return self.output_dir / APPEND_FILE_NAME
+
+    def _append_to_file(self, data):
+        """
+        Append buffered data to the intermediate file of the 'netcdf_append' output format, opening it on first use.
+        """
+
+        if self._append_file is None:
+            fields = {name: array.dtype for name, array in data.items()}
+            # A file left by an earlier run is overwritten, one closed by merge() or dump() is appended to
+            mode = 'a' if self._append_file_created and self.append_file_path.exists() else 'w'
+            self._append_file = self.writer.open_append(APPEND_FILE_NAME, fields, mode=mode)
+            self._append_file_created = True
+        self._append_file.append(data)
+
+    def _close_append_file(self):
+        """
+        Close the intermediate file of the 'netcdf_append' output format, if open.
+        """
+
+        if self._append_file is not None:
+            self._append_file.close()
+            self._append_file = None
 
     def _cleanup_chunk_files(self):
         """
-        Remove all intermediate chunk files (.sim_buffer_*.nc) from the output directory.
+        Remove all intermediate chunk files (.sim_buffer_*.nc and .sim_buffer.nc) and the
+        intermediate Zarr store (.sim_buffer.zarr) from the output directory.
 
         This is called automatically by finalize() when cleanup_chunks=True.
         """
         
-        import os
+        import shutil
         from pathlib import Path
 
-        output_dir = Path(self.writer.output_dir)
-
         # Find all chunk files
-        chunk_files = [
-            output_dir / f for f in os.listdir(output_dir) if f.startswith('.sim_buffer_') and f.endswith('.nc')
-        ]
+        chunk_files = list(Path(self.writer.output_dir).glob('.sim_buffer_*.nc'))
+        if self.append_file_path.exists():
+            self._close_append_file()
+            chunk_files.append(self.append_file_path)
 
-        # Remove each chunk file
-        for chunk_file in chunk_files:
+        # Remove the chunk files concurrently, deleting many small files is bound by syscall latency
+        if chunk_files:
+            with ThreadPoolExecutor(max_workers=min(CLEANUP_WORKERS, len(chunk_files))) as executor:
+                executor.map(_unlink_chunk_file, chunk_files)
+
+        if self.zarr_store.exists():
             try:
-                chunk_file.unlink()  # Delete the file
-            except FileNotFoundError:
-                # File already deleted, ignore
-                pass
+                shutil.rmtree(self.zarr_store)
             except Exception as e:
-                # Log warning but don't fail the operation
-                logging.warning(f'Could not delete chunk file {chunk_file}: {e}')
+                logging.warning(f'Could not delete chunk store {self.zarr_store}: {e}')
 
     def set_mesh(
         self, node_x=NODE_X, node_y=NODE_Y, face_node_connectivity=FACE_NODE_CONNECTIVITY, fill_value=FILL_VALUE
@@ -133,14 +237,77 @@ class DataManager:
         """
         
         self.data_buffer.add(particle_id, time, x, y)
-        if self._mesh_info is not None:
-            node_x, node_y, face_node_connectivity, fill_value = self._mesh_info
-            if self.memory_manager.is_limit_exceeded(self.data_buffer.get_data()):
-                filename = f'.sim_buffer_{self.file_counter}.nc'
-                self.data_buffer.write_to_disk(
-                    node_x, node_y, face_node_connectivity, fill_value, self.writer, filename
-                )
-                self.file_counter += 1
+        # Cheap size check per point; the memory limit itself is only checked once the buffer can exceed it
+        if self.data_buffer.size > self._flush_rows:
+            self._flush_if_limit_exceeded()
+
+    def add_batch(self, particle_ids, time, x, y):
+        """
+        Add a batch of data points (e.g., all particles of a timestep) to the simulation data buffer.
+        The memory limit is checked once for the whole batch; if it is exceeded, the buffer is
+        written to disk and cleared.
+
+        Parameters
+        ----------
+
+        particle_ids : array-like of int
+            Unique identifiers of the particles.
+        time : float, int or array-like
+            Simulation time or time step, either one value for the whole batch or one per particle.
+        x : array-like of float
+            X-coordinates of the particles.
+        y : array-like of float
+            Y-coordinates of the particles.
+        """
+
+        self.data_buffer.add_batch(particle_ids, time, x, y)
+        self._flush_if_limit_exceeded()
+
+    def _flush_if_limit_exceeded(self):
+        """
+        Write the buffer to a chunk file in the background and clear it if it exceeds the memory limit.
+        """
+
+        if self._mesh_info is not None and self.memory_manager.is_limit_exceeded(self.data_buffer.nbytes):
+            self._write_in_background()
+
+    def _write_in_background(self):
+        """
+        Copy the buffered data, clear the buffer and write the copy as the next chunk
+        from the background thread, so the simulation can continue while the chunk is written.
+
+        At most one chunk is written at a time: before handing over the next chunk, this waits
+        for the previous one to be written (re-raising its errors), so memory stays bounded by
+        the buffer plus one chunk in flight, even when the disk is slower than the simulation.
+        """
+
+        self.wait_for_writes()
+        if self.output_format == 'zarr':
+            job = (SimulationDataBuffer.append_dataset_to_zarr, self.data_buffer.to_xarray_dataset(), self.zarr_store)
+        elif self.output_format == 'netcdf_append':
+            job = (_write_with_hdf5_lock, self._append_to_file, self.data_buffer.get_data())
+        else:
+            job = (
+                _write_with_hdf5_lock,
+                self.writer.write_arrays,
+                self.data_buffer.get_data(),
+                f'.sim_buffer_{self.file_counter}.nc',
+            )
+        self.data_buffer.clear()  # the job holds copies of the buffered data
+        self.file_counter += 1
+        if self._write_executor is None:
+            self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sedtrails-writer')
+        self._write_futures.append(self._write_executor.submit(*job))
+
+    def wait_for_writes(self):
+        """
+        Block until all chunks flushed in the background have been written.
+        Errors raised while writing a chunk are re-raised here.
+        """
+
+        futures, self._write_futures = self._write_futures, []
+        for future in futures:
+            future.result()
 
     def write(self, filename=None):
         """
@@ -150,18 +317,30 @@ class DataManager:
         ----------
         
         filename : str or None
-            Name of the output NetCDF file. If None, uses a default naming scheme.
+            Name of the output NetCDF file. If None, writes the next intermediate chunk:
+            a .sim_buffer_<i>.nc file, or an append to the intermediate file or Zarr store for
+            the 'netcdf_append' and 'zarr' output formats.
         """
         
         if self._mesh_info is None:
             raise ValueError('Mesh information must be set before writing data.')
+        self.wait_for_writes()  # keep the chunks in order
         node_x, node_y, face_node_connectivity, fill_value = self._mesh_info
+        if filename is None and self.output_format == 'zarr':
+            self.data_buffer.append_to_zarr(self.zarr_store)
+            self.file_counter += 1
+            return
+        if filename is None and self.output_format == 'netcdf_append':
+            self._append_to_file(self.data_buffer.get_data(copy=False))
+            self.data_buffer.clear()
+            self.file_counter += 1
+            return
         if filename is None:
             filename = f'.sim_buffer_{self.file_counter}.nc'
         self.data_buffer.write_to_disk(node_x, node_y, face_node_connectivity, fill_value, self.writer, filename)
         self.file_counter += 1
 
-    def merge(self, merged_filename='merged_output.nc'):
+    def merge(self, merged_filename='merged_output.nc', workers=1):
         """
         Merge all chunked NetCDF files into a single file.
 
@@ -170,9 +349,21 @@ class DataManager:
         
         merged_filename : str
             Name of the merged output file.
+        workers : int, optional
+            Number of processes reading chunk files in parallel for the 'netcdf' output format (default: 1).
         """
         
-        SimulationDataBuffer.merge_output_files(self.writer.output_dir, merged_filename)
+        self.wait_for_writes()
+        if self.output_format == 'zarr':
+            SimulationDataBuffer.zarr_to_netcdf(self.zarr_store, self.writer.output_dir / merged_filename)
+        elif self.output_format == 'netcdf_append':
+            # All data already is in one file
+            import shutil  # lazy import for performance
+
+            self._close_append_file()
+            shutil.copyfile(self.append_file_path, self.writer.output_dir / merged_filename)
+        else:
+            SimulationDataBuffer.merge_output_files(self.writer.output_dir, merged_filename, workers=workers)
 
     def dump(self, merge=True, merged_filename='final_output.nc', cleanup_chunks=True):
         """
@@ -219,22 +410,41 @@ class DataManager:
 
         final_output_path = None
 
-        # Check if buffer contains data and write it if so
-        buffer_data = self.data_buffer.get_data()
-        if buffer_data['particle_id'].size > 0:
+        # Check if buffer contains data and write it if so, after any chunks still being written
+        if self.data_buffer.size > 0:
             self.write()
+        self.wait_for_writes()
+        if self._write_executor is not None:
+            self._write_executor.shutdown()
+            self._write_executor = None
+        self._close_append_file()
 
         # Merge all chunk files into a single file
         if merge:
-            SimulationDataBuffer.merge_output_files(self.writer.output_dir, merged_filename)
             final_output_path = self.writer.output_dir / merged_filename
+            if self.output_format == 'netcdf_append' and cleanup_chunks and self.append_file_path.exists():
+                # All data already is in one file
+                self.append_file_path.replace(final_output_path)
+                return str(final_output_path)
+            chunk_files = list(self.writer.output_dir.glob('.sim_buffer_*.nc'))
+            if self.output_format == 'netcdf' and cleanup_chunks and len(chunk_files) == 1:
+                # A single chunk already is the merged result
+                chunk_files[0].replace(final_output_path)
+                return str(final_output_path)
+            self.merge(merged_filename)
 
             # Clean up intermediate chunk files after successful merge
             if cleanup_chunks:
                 self._cleanup_chunk_files()
         else:
             # Return the path to the last written file
-            if self.file_counter > 0:
+            if self.output_format == 'zarr':
+                if self.zarr_store.exists():
+                    final_output_path = self.zarr_store
+            elif self.output_format == 'netcdf_append':
+                if self.append_file_path.exists():
+                    final_output_path = self.append_file_path
+            elif self.file_counter > 0:
                 last_file = f'.sim_buffer_{self.file_counter - 1}.nc'
                 final_output_path = self.writer.output_dir / last_file
 
@@ -257,4 +467,6 @@ class DataManager:
             Current simulation time
         """
         
+        from sedtrails.data_manager.xarray_dataset import collect_timestep_data  # lazy import for performance
+
         collect_timestep_data(dataset, populations, timestep, current_time)
@@ -66,12 +66,15 @@ class MemoryManager:
 
         Parameters
         ----------
-        buffer : dict
-            The simulation data buffer (dict of lists or numpy arrays).
+        buffer : dict or int
+            The simulation data buffer (dict of lists or numpy arrays), or its size in bytes.
+            Passing the size directly makes the check O(1), e.g. ``SimulationDataBuffer.nbytes``.
 
         Returns
         -------
         bool
             True if buffer size exceeds max_bytes, False otherwise.
         """
+        if isinstance(buffer, int):
+            return buffer > self.max_bytes
         return self.buffer_size_bytes(buffer) > self.max_bytes
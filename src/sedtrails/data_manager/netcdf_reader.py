@@ -4,7 +4,6 @@ NetCDF Reader
 Reads NetCDF files produced by the SedTrails Particle Tracer System.
 """
 
-import xugrid as xu
 from pathlib import Path
 
 
@@ -49,9 +48,11 @@ class NetCDFReader:
         """
         Validates the file path to ensure it exists and is a NetCDF file.
         
+        The file is not opened here; whether it is readable as NetCDF is checked when it is read.
+
         Raises:
             FileNotFoundError: If the file does not exist.
-            ValueError: If the file exists but is not a valid NetCDF file.
+            ValueError: If the file does not have a NetCDF extension.
         
         Returns:
             bool: True if the file is valid.
@@ -67,22 +68,20 @@ class NetCDFReader:
         if path.suffix.lower() not in FILE_EXTENSIONS:
             raise ValueError(f"Invalid file type. Expected NetCDF file with extensions {FILE_EXTENSIONS}, got: {path.suffix}")
         
-        # Optional: Check if file is actually readable as NetCDF
-        try:
-            xu.open_dataset(self.file_path)
-        except Exception as e:
-            raise ValueError(f"File exists but is not a valid NetCDF file: {e}") from e
-        
         return True
 
     def _read_file(self):
         """
         Reads the NetCDF file using the lazy loader from xugrid.
         """
+        import xugrid as xu  # lazy import for performance
+
         if not self._validate_file():
             raise ValueError("Invalid file path. Ensure the file is a NetCDF file.")
-        else:
+        try:
             self.data = xu.open_dataset(self.file_path)
+        except Exception as e:
+            raise ValueError(f"File exists but is not a valid NetCDF file: {e}") from e
 
 
 if __name__ == "__main__":
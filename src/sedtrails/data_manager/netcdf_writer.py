@@ -6,11 +6,178 @@ Writes NetCDF files produced by the SedTrails Particle Tracer System.
 
 """
 
+import netCDF4
 import numpy as np
-import xarray as xr
 from pathlib import Path
-from datetime import datetime
-from .xarray_dataset import create_sedtrails_dataset, populate_population_metadata, populate_flowfield_metadata
+from datetime import datetime, timezone
+
+# Target size of a NetCDF (HDF5) chunk in bytes
+CHUNK_TARGET_BYTES = 1024 * 1024
+# Dimensions along which variables are split into chunks; all other dimensions are kept whole
+CHUNK_DIMS = ('n_timesteps', 'time')
+# zlib compression level of the chunked variables; level 1 gives most of the size reduction at the highest speed
+COMPRESSION_LEVEL = 1
+# Floating point variables that least_significant_digit quantization applies to
+POSITION_VARIABLES = ('x', 'y')
+# Supported compression filters
+COMPRESSIONS = ('zlib', 'zstd')
+# Encoding entries of a variable that are kept when it is chunked and compressed by _chunk_encoding:
+# its on-disk packing and fill values. Layout and compression entries (e.g. of the file it was read from) are replaced
+KEPT_ENCODING_KEYS = (
+    'dtype',
+    '_FillValue',
+    'missing_value',
+    'scale_factor',
+    'add_offset',
+    'units',
+    'calendar',
+    'endian',
+    'least_significant_digit',
+    'significant_digits',
+    'quantize_mode',
+)
+
+
+def _chunk_length(itemsize, length, target_bytes=CHUNK_TARGET_BYTES):
+    """
+    Number of values of ``itemsize`` bytes in a chunk of about ``target_bytes`` of a 1-D variable of ``length`` values.
+    """
+    return min(max(1, target_bytes // itemsize), length)
+
+
+def _compression_encoding(compression='zlib', complevel=COMPRESSION_LEVEL):
+    """
+    NetCDF encoding entries that compress a variable with ``compression`` at ``complevel``, after the shuffle filter.
+    """
+    if compression == 'zlib':
+        return {'zlib': True, 'complevel': complevel, 'shuffle': True}
+    return {'compression': compression, 'complevel': complevel, 'shuffle': True}
+
+
+def _chunk_encoding(
+    xr_dataset,
+    target_bytes=CHUNK_TARGET_BYTES,
+    complevel=COMPRESSION_LEVEL,
+    least_significant_digit=None,
+    compression='zlib',
+    significant_digits=None,
+):
+    """
+    Build a NetCDF encoding with chunk sizes of about ``target_bytes`` for the numeric variables.
+
+    Chunks span all particles (and populations, flow fields, ...) and as many time steps
+    as fit in the target size, so reading all particles at a time step touches one chunk.
+    Chunks are compressed with the shuffle filter and zlib (or zstd).
+
+    Parameters
+    ----------
+    xr_dataset : xr.Dataset
+        The dataset to be written.
+    target_bytes : int, optional
+        Target size of a chunk in bytes (default: 1 MB).
+    complevel : int, optional
+        zlib compression level from 1 to 9, or 0 to write uncompressed chunks (default: 1).
+    least_significant_digit : int or None, optional
+        Number of decimals to keep in the particle positions (POSITION_VARIABLES), e.g. 3 for
+        millimetre precision on positions in metres. Quantizing is lossy but makes the positions
+        compress much better. None (default) keeps full precision.
+    compression : str, optional
+        Compression filter, 'zlib' (default) or 'zstd'.
+    significant_digits : int or None, optional
+        Number of significant digits to keep in all floating point data variables (netCDF-C
+        quantization). Lossy, None (default) keeps full precision.
+
+    Returns
+    -------
+    dict
+        Encoding per variable name, to be passed to ``xr.Dataset.to_netcdf``. The entries of the
+        variables' own encoding listed in KEPT_ENCODING_KEYS (packing, fill values) are included.
+    """
+    encoding = {}
+    for name, variable in xr_dataset.variables.items():
+        if name in xr_dataset.dims or variable.dtype.kind not in 'biuf':
+            continue
+        chunk_dims = [dim for dim in variable.dims if dim in CHUNK_DIMS]
+        if not chunk_dims or 0 in variable.shape:
+            continue
+        chunk_dim = chunk_dims[0]
+        row_bytes = variable.dtype.itemsize
+        for dim, size in variable.sizes.items():
+            if dim != chunk_dim:
+                row_bytes *= size
+        chunk_length = min(max(1, target_bytes // row_bytes), variable.sizes[chunk_dim])
+        # The encoding passed to to_netcdf replaces the variable's own, so carry over its packing and fill values
+        encoding[name] = {key: value for key, value in variable.encoding.items() if key in KEPT_ENCODING_KEYS}
+        encoding[name]['chunksizes'] = tuple(
+            chunk_length if dim == chunk_dim else size for dim, size in variable.sizes.items()
+        )
+        if complevel:
+            encoding[name].update(_compression_encoding(compression, complevel))
+            if significant_digits is not None and name in xr_dataset.data_vars and variable.dtype.kind == 'f':
+                encoding[name]['significant_digits'] = significant_digits
+            if least_significant_digit is not None and name in POSITION_VARIABLES and variable.dtype.kind == 'f':
+                encoding[name]['least_significant_digit'] = least_significant_digit
+    return encoding
+
+
+class NetCDFAppendFile:
+    """
+    A NetCDF file that is kept open while one-dimensional arrays are appended to it along an
+    unlimited dimension. Created by ``NetCDFWriter.open_append``.
+
+    Attributes
+    ----------
+    path : pathlib.Path
+        Path to the file.
+    length : int
+        Number of values appended to each variable so far.
+    """
+
+    def __init__(self, path, fields, dim, compression, complevel, attrs, mode='w'):
+        self.path = path
+        self.dim = dim
+        if mode == 'a':
+            # Continue after the values appended before the file was closed
+            self._nc = netCDF4.Dataset(path, 'a')
+            self.length = len(self._nc.dimensions[dim])
+            return
+        self.length = 0
+        self._nc = netCDF4.Dataset(path, 'w', format='NETCDF4', clobber=True)
+        self._nc.setncatts(attrs)
+        self._nc.createDimension(dim, None)
+        # The coordinate is created first, as xarray does
+        for name in sorted(fields, key=lambda key: key != dim):
+            dtype = np.dtype(fields[name])
+            self._nc.createVariable(
+                name,
+                dtype,
+                (dim,),
+                compression=compression if complevel else None,
+                complevel=complevel or 4,
+                shuffle=bool(complevel),
+                chunksizes=(max(1, CHUNK_TARGET_BYTES // dtype.itemsize),),
+            )
+
+    def append(self, data):
+        """
+        Append arrays of equal length to the variables of the same name.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary with variable names as keys and 1-D numpy arrays as values.
+        """
+        stop = self.length + len(data[self.dim])
+        for name, array in data.items():
+            self._nc.variables[name][self.length : stop] = array
+        self.length = stop
+
+    def close(self):
+        """
+        Close the file. Further appends are not possible.
+        """
+        if self._nc.isopen():
+            self._nc.close()
 
 
 class NetCDFWriter:
@@ -55,10 +222,25 @@ class NetCDFWriter:
     ----------
     output_dir : pathlib.Path
         The directory where output files (NetCDF, images, etc.) are stored.
+    compression : str
+        Compression filter of the written variables, 'zlib' or 'zstd'.
+    complevel : int
+        Compression level, 0 writes uncompressed variables.
+    significant_digits : int or None
+        Number of significant digits kept in floating point data variables, None for full precision.
 
     """
 
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, complevel=COMPRESSION_LEVEL, compression='zlib', significant_digits=None):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown compression {compression!r}, expected one of {COMPRESSIONS}.')
+        if compression == 'zstd' and not netCDF4.__has_zstandard_support__:
+            raise ValueError('The netCDF library does not support zstd compression, use zlib instead.')
+        if significant_digits is not None and not netCDF4.__has_quantization_support__:
+            raise ValueError('The netCDF library does not support quantization with significant_digits.')
+        self.compression = compression
+        self.complevel = complevel
+        self.significant_digits = significant_digits
         output_dir = Path(output_dir)
         # If the output directory already exists, we add a timestamp to avoid overwriting
         # if output_dir.exists():
@@ -67,6 +249,16 @@ class NetCDFWriter:
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def _standard_attrs(self):
+        """
+        Standard global attributes of a file written by this writer, created now (in UTC).
+        """
+        return {
+            'title': 'SedTrails Particle Simulation Results',
+            'institution': 'SedTrails Particle Tracer System',
+            'created_on': datetime.now(timezone.utc).isoformat(),
+        }
+
     def _validate_filename(self, filename):
         """
         Validates the file name to ensure it is a NetCDF file.
@@ -74,7 +266,9 @@ class NetCDFWriter:
         if not filename.endswith('.nc'):
             raise ValueError('Output file must have a .nc extension.')
 
-    def write(self, xr_dataset, filename, trim_to_actual_timesteps=False, actual_timesteps=None):
+    def write(
+        self, xr_dataset, filename, trim_to_actual_timesteps=False, actual_timesteps=None, least_significant_digit=None
+    ):
         """
         Write an xr.Dataset to a NetCDF file in the output directory.
 
@@ -87,7 +281,11 @@ class NetCDFWriter:
         trim_to_actual_timesteps : bool, optional
             Whether to trim the dataset to actual timesteps used (default: False)
         actual_timesteps : int, optional
-            Number of actual timesteps to keep (if None, tries to determine automatically)
+            Number of actual timesteps to keep, required if trim_to_actual_timesteps is True.
+            Callers count the timesteps they have written.
+        least_significant_digit : int, optional
+            Number of decimals to keep in the particle positions, trading precision for a smaller
+            file (default: None, full precision)
 
         Returns
         -------
@@ -97,6 +295,8 @@ class NetCDFWriter:
         """
         self._validate_filename(filename)
         output_path = self.output_dir / filename
+        import xarray as xr  # lazy import for performance
+
         if not isinstance(xr_dataset, xr.Dataset):
             raise TypeError('Input must be an xr.Dataset.')
 
@@ -105,30 +305,107 @@ class NetCDFWriter:
         # Handle trimming if requested
         if trim_to_actual_timesteps:
             if actual_timesteps is None:
-                # Try to determine actual timesteps by finding the last non-NaN time value
-                if 'time' in xr_dataset and 'n_timesteps' in xr_dataset.dims:
-                    time_data = xr_dataset['time'].values
-                    if not np.all(np.isnan(time_data)):
-                        # Find the last timestep with any non-NaN values
-                        non_nan_mask = ~np.isnan(time_data)
-                        if np.any(non_nan_mask):
-                            last_timestep = np.max(np.where(non_nan_mask)[1]) + 1
-                            actual_timesteps = last_timestep
-
-            if actual_timesteps is not None and 'n_timesteps' in xr_dataset.dims:
+                raise ValueError('actual_timesteps must be given when trim_to_actual_timesteps is True.')
+            if 'n_timesteps' in xr_dataset.dims:
                 output_dataset = xr_dataset.isel(n_timesteps=slice(0, actual_timesteps))
 
         # Add standard metadata if not present
-        if 'title' not in output_dataset.attrs:
-            output_dataset.attrs['title'] = 'SedTrails Particle Simulation Results'
-        if 'institution' not in output_dataset.attrs:
-            output_dataset.attrs['institution'] = 'SedTrails Particle Tracer System'
-        if 'created_on' not in output_dataset.attrs:
-            output_dataset.attrs['created_on'] = datetime.now().isoformat()
-
-        output_dataset.to_netcdf(output_path)
+        for key, value in self._standard_attrs().items():
+            output_dataset.attrs.setdefault(key, value)
+
+        encoding = _chunk_encoding(
+            output_dataset,
+            complevel=self.complevel,
+            least_significant_digit=least_significant_digit,
+            compression=self.compression,
+            significant_digits=self.significant_digits,
+        )
+        output_dataset.to_netcdf(output_path, encoding=encoding)
         return output_path
 
+    def write_arrays(self, data, filename, dim='time', complevel=None):
+        """
+        Write one-dimensional arrays sharing a dimension directly to a NetCDF file with netCDF4,
+        without building an xr.Dataset first. Used for the intermediate buffer chunks, where the
+        xarray overhead dominates the write time of small flushes.
+
+        The file reads back with xarray like a dataset with ``dim`` as coordinate. Variables are
+        chunked and compressed as in ``write``.
+
+        Parameters
+        ----------
+        data : dict
+            Dictionary with variable names as keys and 1-D numpy arrays of equal length as values.
+            The variable named ``dim`` becomes the coordinate.
+        filename : str
+            The name of the NetCDF file to write (should end with .nc).
+        dim : str, optional
+            Name of the shared dimension (default: 'time').
+        complevel : int, optional
+            Compression level, or 0 to write uncompressed (default: the writer's complevel).
+
+        Returns
+        -------
+        pathlib.Path
+            Path to the written file
+        """
+        self._validate_filename(filename)
+        output_path = self.output_dir / filename
+        length = len(data[dim])
+        if complevel is None:
+            complevel = self.complevel
+
+        with netCDF4.Dataset(output_path, 'w', format='NETCDF4', clobber=True) as nc:
+            nc.setncatts(self._standard_attrs())
+            # Fixed-size dimension: the length is known at write time, and unlimited dimensions are
+            # slower to write and force chunking along them
+            nc.createDimension(dim, length)
+            # The coordinate is written first, as xarray does
+            for name in sorted(data, key=lambda key: key != dim):
+                array = np.asarray(data[name])
+                chunksizes = (_chunk_length(array.itemsize, length),) if length else None
+                variable = nc.createVariable(
+                    name,
+                    array.dtype,
+                    (dim,),
+                    compression=self.compression if complevel else None,
+                    complevel=complevel or 4,
+                    shuffle=bool(complevel),
+                    chunksizes=chunksizes,
+                )
+                variable[:] = array
+        return output_path
+
+    def open_append(self, filename, fields, dim='time', mode='w'):
+        """
+        Create a NetCDF file that stays open for appending one-dimensional arrays along an
+        unlimited dimension, so repeated writes do not reopen the file.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the NetCDF file to create (should end with .nc).
+        fields : dict
+            Dictionary with variable names as keys and numpy dtypes as values.
+            The variable named ``dim`` becomes the coordinate.
+        dim : str, optional
+            Name of the unlimited dimension (default: 'time').
+        mode : str, optional
+            'w' (default) creates the file, overwriting an existing one. 'a' reopens a file created
+            earlier by ``open_append`` and appends after the values it already holds.
+
+        Returns
+        -------
+        NetCDFAppendFile
+            The open file; close it when done.
+        """
+        self._validate_filename(filename)
+        if mode not in ('w', 'a'):
+            raise ValueError(f"Unknown mode {mode!r}, expected 'w' or 'a'.")
+        return NetCDFAppendFile(
+            self.output_dir / filename, fields, dim, self.compression, self.complevel, self._standard_attrs(), mode
+        )
+
     def create_dataset(self, N_particles, N_populations, N_timesteps, N_flowfields, name_strlen=24):
         """
         Create an xarray dataset with the SedTrails structure.
@@ -151,6 +428,8 @@ class NetCDFWriter:
         xr.Dataset
             The created xarray dataset
         """
+        from .xarray_dataset import create_sedtrails_dataset  # lazy import for performance
+
         return create_sedtrails_dataset(
             N_particles=N_particles,
             N_populations=N_populations,
@@ -179,19 +458,23 @@ class NetCDFWriter:
         xr.Dataset
             The dataset with metadata added (modifies in place and returns)
         """
+        from .xarray_dataset import (  # lazy import for performance
+            populate_flowfield_metadata,
+            populate_population_metadata,
+        )
+
         # Populate population and flow field metadata
         populate_population_metadata(dataset, populations)
         if flow_field_names:
             populate_flowfield_metadata(dataset, flow_field_names)
 
-        # Add simulation metadata as global attributes if provided
-        if simulation_metadata:
-            dataset.attrs.update(simulation_metadata)
-
-        # Add standard metadata
-        dataset.attrs['title'] = 'SedTRAILS Particle Simulation Results'
-        dataset.attrs['institution'] = 'SedTRAILS Particle Tracer System'
-        dataset.attrs['created_on'] = datetime.now().isoformat()
+        # Add simulation metadata as global attributes if provided, and the standard metadata, in one update
+        dataset.attrs.update(
+            simulation_metadata or {},
+            title='SedTRAILS Particle Simulation Results',
+            institution='SedTRAILS Particle Tracer System',
+            created_on=datetime.now(timezone.utc).isoformat(),
+        )
 
         return dataset
 
@@ -229,7 +512,7 @@ class NetCDFWriter:
 
         """
         # Calculate dimensions
-        total_particles = sum([len(pop.particles['x']) for pop in populations])
+        total_particles = sum(len(pop.particles['x']) for pop in populations)
         n_populations = len(populations)
         n_flowfields = len(flow_field_names) if flow_field_names else 1
 
@@ -1,30 +1,98 @@
-import os
-import xarray as xr
+import netCDF4
 import numpy as np
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+from sedtrails.data_manager.netcdf_writer import COMPRESSION_LEVEL, COMPRESSIONS, _chunk_encoding, _chunk_length
 
 
 class SimulationDataBuffer:
     """
     Temporarily stores chunks of simulation data in memory, while they wait to be written to a simulation file.
 
+    The data is stored as a structure of arrays: one preallocated numpy array per field,
+    filled up to ``size`` and grown by doubling when full. Clearing the buffer keeps the arrays,
+    so after the first flush the same memory is reused for every following chunk.
+
     Attributes
     ----------
     buffer : dict
         Dictionary holding simulation data arrays (particle ID, positions, and times at the moment).
+        Only the first ``size`` entries of each array hold data.
+    size : int
+        Number of data points currently stored in the buffer.
     """
 
-    def __init__(self):
+    # Field names and data types of the buffered arrays. Positions and time are stored in double precision,
+    # as single precision resolves projected coordinates of ~1e6 m only to ~0.1 m.
+    FIELDS = {
+        'particle_id': np.int32,
+        'time': np.float64,
+        'x': np.float64,
+        'y': np.float64,
+        # Add other fields as needed (e.g., velocity, status, etc.)
+    }
+
+    # Number of bytes used by one data point across all fields
+    ROW_NBYTES = sum(np.dtype(dtype).itemsize for dtype in FIELDS.values())
+
+    def __init__(self, capacity=1024, max_capacity=None):
         """
         Initialize an empty simulation data buffer.
+
+        Parameters
+        ----------
+        capacity : int, optional
+            Number of data points to preallocate (default: 1024). The buffer grows as needed.
+        max_capacity : int or None, optional
+            Number of data points the buffer is expected to hold at most before it is flushed, e.g.
+            derived from the memory limit. Growth stops at this size instead of doubling past it;
+            if more data points are added anyway, the buffer grows by doubling from there.
+            None (default) means no cap.
         """
-        self.buffer = {
-            'particle_id': [],
-            'time': [],
-            'x': [],
-            'y': [],
-            # Add other fields as needed (e.g., velocity, status, etc.)
-        }
+        self.size = 0
+        self.max_capacity = max_capacity
+        self.buffer = {key: np.empty(max(int(capacity), 1), dtype=dtype) for key, dtype in self.FIELDS.items()}
+
+    def __len__(self):
+        """
+        Number of data points currently stored in the buffer.
+        """
+        return self.size
+
+    @property
+    def nbytes(self):
+        """
+        Number of bytes used by the data points currently stored in the buffer.
+        """
+        return self.size * self.ROW_NBYTES
+
+    @property
+    def capacity(self):
+        """
+        Number of data points the buffer can hold before it has to grow.
+        """
+        return len(self.buffer['particle_id'])
+
+    def _reserve(self, n_points):
+        """
+        Make sure the buffer can hold ``n_points`` data points, doubling its capacity as needed.
+        """
+        capacity = self.capacity
+        if n_points <= capacity:
+            return
+        while capacity < n_points:
+            capacity *= 2
+        # Stop at max_capacity instead of doubling past it. Once the buffer has to hold more
+        # (e.g. data added before it can be flushed), it keeps doubling to keep appends amortized O(1)
+        if self.max_capacity is not None and n_points <= self.max_capacity:
+            capacity = min(capacity, self.max_capacity)
+        for key, array in self.buffer.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[: self.size] = array[: self.size]
+            self.buffer[key] = grown
 
     def add(self, particle_id, time, x, y):
         """
@@ -41,28 +109,70 @@ class SimulationDataBuffer:
         y : float
             Y-coordinate of the particle.
         """
-        self.buffer['particle_id'].append(particle_id)
-        self.buffer['time'].append(time)
-        self.buffer['x'].append(x)
-        self.buffer['y'].append(y)
+        n = self.size
+        if n == self.capacity:
+            self._reserve(n + 1)
+        buffer = self.buffer
+        buffer['particle_id'][n] = particle_id
+        buffer['time'][n] = time
+        buffer['x'][n] = x
+        buffer['y'][n] = y
+        self.size = n + 1
+
+    def add_batch(self, particle_ids, time, x, y):
+        """
+        Add a batch of data points to the buffer in one go.
+
+        Parameters
+        ----------
+        particle_ids : array-like of int
+            Unique identifiers of the particles.
+        time : float, int or array-like
+            Simulation time or time step, either one value for the whole batch or one per particle.
+        x : array-like of float
+            X-coordinates of the particles.
+        y : array-like of float
+            Y-coordinates of the particles.
+        """
+        particle_ids = np.asarray(particle_ids)
+        n_new = particle_ids.size
+        if n_new == 0:
+            return
+        start = self.size
+        stop = start + n_new
+        self._reserve(stop)
+        buffer = self.buffer
+        buffer['particle_id'][start:stop] = particle_ids.ravel()
+        buffer['time'][start:stop] = np.ravel(time) if np.ndim(time) else time
+        buffer['x'][start:stop] = np.ravel(x)
+        buffer['y'][start:stop] = np.ravel(y)
+        self.size = stop
 
     def clear(self):
         """
-        Clear the buffer.
+        Clear the buffer. The allocated arrays are kept for reuse.
         """
-        for key in self.buffer:
-            self.buffer[key] = []
+        self.size = 0
 
-    def get_data(self):
+    def get_data(self, copy=True):
         """
         Return the buffer as a dictionary of numpy arrays.
 
+        Parameters
+        ----------
+        copy : bool, optional
+            If True (default), return copies of the buffered data. If False, return views
+            into the buffer, which are only valid until the buffer is cleared or grows.
+
         Returns
         -------
         dict
             Dictionary with keys as field names and values as numpy arrays.
         """
-        return {k: np.array(v) for k, v in self.buffer.items()}
+        n = self.size
+        if copy:
+            return {k: v[:n].copy() for k, v in self.buffer.items()}
+        return {k: v[:n] for k, v in self.buffer.items()}
 
     def to_xarray_dataset(self):
         """
@@ -73,6 +183,8 @@ class SimulationDataBuffer:
         xr.Dataset
             xarray dataset containing the buffered simulation data.
         """
+        import xarray as xr  # lazy import for performance
+
         data = self.get_data()
 
         # Create simple xarray dataset with time dimension
@@ -106,19 +218,75 @@ class SimulationDataBuffer:
         filename : str
             Name of the output NetCDF file.
         """
-        xr_ds = self.to_xarray_dataset()
-        writer.write(xr_ds, filename)
+        writer.write_arrays(self.get_data(copy=False), filename)
+        self.clear()
+
+    def append_to_zarr(self, store):
+        """
+        Append the current buffer along time to a Zarr store and clear the buffer.
+        The store is created on the first call.
+
+        Parameters
+        ----------
+        store : Path or str
+            Path to the Zarr store.
+        """
+        self.append_dataset_to_zarr(self.to_xarray_dataset(), store)
         self.clear()
 
     @staticmethod
-    def merge_output_files(output_dir, merged_filename='merged_output.nc'):
+    def append_dataset_to_zarr(xr_ds, store):
+        """
+        Append a dataset created by to_xarray_dataset along time to a Zarr store.
+        The store is created on the first call.
+
+        Parameters
+        ----------
+        xr_ds : xr.Dataset
+            Dataset holding buffered simulation data.
+        store : Path or str
+            Path to the Zarr store.
+        """
+        if Path(store).exists():
+            xr_ds.to_zarr(store, append_dim='time')
+        else:
+            # The encoding is stored with the arrays on creation; appends reuse it
+            xr_ds.to_zarr(store, mode='w', encoding=_zarr_encoding(xr_ds))
+
+    @staticmethod
+    def zarr_to_netcdf(store, output_path):
+        """
+        Write the contents of a Zarr store written by append_to_zarr to a single NetCDF file.
+
+        Parameters
+        ----------
+        store : Path or str
+            Path to the Zarr store.
+        output_path : Path or str
+            Path of the NetCDF file to write.
+        """
+        if not Path(store).exists():
+            raise FileNotFoundError(f'No Zarr store found at {store} to convert.')
+        import xarray as xr  # lazy import for performance
+
+        with xr.open_zarr(store) as ds:
+            ds.to_netcdf(output_path, encoding=_chunk_encoding(ds))
+
+    @staticmethod
+    def merge_output_files(output_dir, merged_filename='merged_output.nc', workers=1):
         """
         Merge all .sim_buffer_*.nc files in the output directory into a single NetCDF file.
 
-        Merging is based on the assumption that all files have the same structure and can be
-        combined by coordinates, e.g., time, observation index, etc. This way, the merged
+        Merging is based on the assumption that all files have the same structure and hold
+        consecutive, non-overlapping stretches of the simulation along the time dimension,
+        in the order of their file index. The files are therefore concatenated along time
+        in that order, without aligning coordinates across files. This way, the merged
         file will contain the entire simulation duration and all particles.
-        Each file chunk should have non-overlapping coordinate values.
+
+        The merged file is written with netCDF4 directly: its variables are created once with
+        the total length, and each chunk file is copied into its slice, without decoding the
+        data or building intermediate datasets. With ``workers`` > 1, the chunk files are read
+        and decompressed by that many worker processes, while the merged file is written in order.
 
         Parameters
         ----------
@@ -126,13 +294,116 @@ class SimulationDataBuffer:
             Directory containing the intermediate NetCDF files.
         merged_filename : str
             Name of the merged output file.
+        workers : int, optional
+            Number of processes reading the chunk files (default: 1, read in this process).
         """
         output_dir = Path(output_dir)
         print('Output dir:', output_dir)
-        files = sorted(
-            output_dir / f for f in os.listdir(output_dir) if f.startswith('.sim_buffer_') and f.endswith('.nc')
-        )
+        files = list(output_dir.glob('.sim_buffer_*.nc'))
         if not files:
             raise FileNotFoundError('No .sim_buffer_*.nc files found to merge.')
-        ds = xr.open_mfdataset(files, combine='by_coords')
-        ds.to_netcdf(output_dir / merged_filename)
+        files.sort(key=_chunk_file_index)
+        with ExitStack() as stack:
+            sources = [stack.enter_context(netCDF4.Dataset(file, 'r')) for file in files]
+            for source in sources:
+                source.set_auto_maskandscale(False)
+            lengths = [len(source.dimensions['time']) for source in sources]
+            first = sources[0]
+
+            with netCDF4.Dataset(output_dir / merged_filename, 'w', format='NETCDF4') as merged:
+                merged.setncatts(first.__dict__)
+                # Fixed-size, like in the chunk files; nothing appends to the merged file
+                merged.createDimension('time', sum(lengths))
+                for name, variable in first.variables.items():
+                    attributes = variable.__dict__.copy()
+                    if 'time' in variable.dimensions:
+                        # Chunks span the time dimension only, as in NetCDFWriter.write_arrays
+                        chunksizes = tuple(
+                            _chunk_length(variable.dtype.itemsize, sum(lengths)) if dim == 'time' else size
+                            for dim, size in zip(variable.dimensions, variable.shape, strict=True)
+                        )
+                    else:
+                        chunksizes = None
+                    # Compressed with the filter of the chunk files
+                    filters = variable.filters() or {}
+                    compression = next((c for c in COMPRESSIONS if filters.get(c)), None)
+                    merged_variable = merged.createVariable(
+                        name,
+                        variable.dtype,
+                        variable.dimensions,
+                        compression=compression,
+                        complevel=filters.get('complevel') or COMPRESSION_LEVEL,
+                        shuffle=filters.get('shuffle', False),
+                        chunksizes=chunksizes if sum(lengths) else None,
+                        fill_value=attributes.pop('_FillValue', None),
+                    )
+                    merged_variable.set_auto_maskandscale(False)
+                    merged_variable.setncatts(attributes)
+                    if 'time' not in variable.dimensions:
+                        merged_variable[...] = variable[...]
+
+                # Copy the chunks into their slices of the time dimension, in file order
+                names = [name for name, variable in first.variables.items() if 'time' in variable.dimensions]
+                if workers > 1 and len(files) > 1:
+                    chunks = _read_chunk_files_in_parallel(files, names, workers)
+                else:
+                    chunks = ({name: source.variables[name][...] for name in names} for source in sources)
+                offset = 0
+                for chunk, length in zip(chunks, lengths, strict=True):
+                    for name, values in chunk.items():
+                        merged_variable = merged.variables[name]
+                        index = [slice(None)] * merged_variable.ndim
+                        index[merged_variable.dimensions.index('time')] = slice(offset, offset + length)
+                        merged_variable[tuple(index)] = values
+                    offset += length
+
+
+def _zarr_encoding(xr_ds):
+    """
+    Zarr encoding that compresses every data variable of ``xr_ds`` with Blosc zstd after the bitshuffle filter.
+    """
+    import zarr  # lazy import for performance
+
+    if int(zarr.__version__.split('.')[0]) >= 3:
+        from zarr.codecs import BloscCodec
+
+        codec = {'compressors': [BloscCodec(cname='zstd', clevel=COMPRESSION_LEVEL, shuffle='bitshuffle')]}
+    else:
+        from numcodecs import Blosc
+
+        codec = {'compressor': Blosc(cname='zstd', clevel=COMPRESSION_LEVEL, shuffle=Blosc.BITSHUFFLE)}
+    return {name: dict(codec) for name in xr_ds.data_vars}
+
+
+def _read_chunk_file(path, names):
+    """
+    Read the raw (not masked or scaled) values of the variables ``names`` from a chunk file.
+    """
+    with netCDF4.Dataset(path, 'r') as source:
+        source.set_auto_maskandscale(False)
+        return {name: source.variables[name][...] for name in names}
+
+
+def _read_chunk_files_in_parallel(files, names, workers):
+    """
+    Read chunk files in worker processes and yield their variables in file order.
+    At most two files per worker are read ahead, to bound the memory held by finished reads.
+    """
+    # spawn instead of fork: the parent may run a background writer thread holding HDF5 state
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=context) as executor:
+        pending = deque()
+        for file in files:
+            pending.append(executor.submit(_read_chunk_file, file, names))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunk_file_index(path):
+    """
+    Return the index of a .sim_buffer_<index>.nc chunk file, used to sort chunk files in write order.
+    """
+    index = Path(path).name[len('.sim_buffer_') : -len('.nc')]
+    return (0, int(index), '') if index.isdigit() else (1, 0, index)
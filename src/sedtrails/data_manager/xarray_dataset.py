@@ -1,36 +1,57 @@
 import numpy as np
 import xarray as xr
 
+# Values of the status variables for particles that do not track them
+STATUS_DEFAULTS = {
+    'status_alive': 1,
+    'status_buried': 0,
+    'status_domain': 1,
+    'status_transported': 0,
+    'status_released': 1,
+    'status_mobile': 0,
+}
+
 
 def create_sedtrails_dataset(N_particles, N_populations, N_timesteps, N_flowfields, name_strlen=24):
     ds = xr.Dataset(
         {
             # Population metadata - initialize with empty/default values
             'population_name': (('n_populations', 'name_strlen'), np.empty((N_populations, name_strlen), dtype='S1')),
-            'population_particle_type': ('n_populations', np.zeros(N_populations, dtype=int)),
-            'population_start_idx': ('n_populations', np.zeros(N_populations, dtype=int)),
-            'population_count': ('n_populations', np.zeros(N_populations, dtype=int)),
+            'population_particle_type': ('n_populations', np.zeros(N_populations, dtype=np.int32)),
+            'population_start_idx': ('n_populations', np.zeros(N_populations, dtype=np.int32)),
+            'population_count': ('n_populations', np.zeros(N_populations, dtype=np.int32)),
             # Trajectory metadata
             'trajectory_id': (('n_particles', 'name_strlen'), np.empty((N_particles, name_strlen), dtype='S1')),
-            'population_id': ('n_particles', np.zeros(N_particles, dtype=int)),
-            # Core trajectory variables - initialize with NaN to indicate unset values
+            'population_id': ('n_particles', np.zeros(N_particles, dtype=np.int32)),
+            # Core trajectory variables - initialize with NaN to indicate unset values.
+            # Time and the horizontal positions (projected coordinates of up to ~1e6 m) are kept in double
+            # precision; elevations and depths are small values for which single precision resolves ~1e-6 m
             'time': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
             'x': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
             'y': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
-            'z': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
-            'burial_depth': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
-            'mixing_depth': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan)),
+            'z': (('n_particles', 'n_timesteps'), np.full((N_particles, N_timesteps), np.nan, dtype=np.float32)),
+            'burial_depth': (
+                ('n_particles', 'n_timesteps'),
+                np.full((N_particles, N_timesteps), np.nan, dtype=np.float32),
+            ),
+            'mixing_depth': (
+                ('n_particles', 'n_timesteps'),
+                np.full((N_particles, N_timesteps), np.nan, dtype=np.float32),
+            ),
             # Status variables - initialize with zeros (False/not active)
-            'status_alive': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            'status_buried': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            'status_domain': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            'status_transported': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            'status_released': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            'status_mobile': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=int)),
-            # Transport distances per flow field
+            'status_alive': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=np.int32)),
+            'status_buried': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=np.int32)),
+            'status_domain': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=np.int32)),
+            'status_transported': (
+                ('n_particles', 'n_timesteps'),
+                np.zeros((N_particles, N_timesteps), dtype=np.int32),
+            ),
+            'status_released': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=np.int32)),
+            'status_mobile': (('n_particles', 'n_timesteps'), np.zeros((N_particles, N_timesteps), dtype=np.int32)),
+            # Transport distances per flow field, covered in one output timestep
             'covered_distance': (
                 ('n_flowfields', 'n_particles', 'n_timesteps'),
-                np.zeros((N_flowfields, N_particles, N_timesteps)),
+                np.zeros((N_flowfields, N_particles, N_timesteps), dtype=np.float32),
             ),
             'flowfield_name': (('n_flowfields', 'name_strlen'), np.empty((N_flowfields, name_strlen), dtype='S1')),
         },
@@ -46,6 +67,57 @@ def create_sedtrails_dataset(N_particles, N_populations, N_timesteps, N_flowfiel
     return ds
 
 
+def _char_array(name, max_len):
+    """
+    Convert a name to a character array of length ``max_len``, truncated or padded with spaces.
+    """
+    return np.frombuffer(name[:max_len].ljust(max_len).encode('ascii'), dtype='S1')
+
+
+def _trajectory_ids(start, stop, max_len):
+    """
+    Character arrays of the trajectory IDs 'traj_<index>' of particles ``start`` to ``stop``,
+    truncated or padded with spaces to ``max_len``, as one (stop - start, max_len) array.
+    """
+    if stop <= start:
+        return np.empty((0, max_len), dtype='S1')
+    ids = np.char.ljust(np.char.add('traj_', np.arange(start, stop).astype(str)), max_len)
+    return ids.astype(f'S{max_len}').view('S1').reshape(stop - start, max_len)
+
+
+def _concatenate_field(populations, name, default=None):
+    """
+    Values of particle field ``name`` of all populations, one after the other.
+
+    Populations without the field contribute ``default``. If no population has the field,
+    ``default`` itself is returned so it can be broadcast; a single population's array is returned as is.
+    """
+    values = [population.particles.get(name) for population in populations]
+    if all(value is None for value in values):
+        return default
+    if len(values) == 1:
+        return values[0]
+    return np.concatenate(
+        [
+            np.full(len(population.particles['x']), default) if value is None else value
+            for population, value in zip(populations, values, strict=True)
+        ]
+    )
+
+
+def _numpy_data(ds, name):
+    """
+    The numpy array holding variable ``name`` of ``ds``, for writing into it in place.
+
+    Lazy variables (e.g. dask arrays) are loaded into memory first; other array types raise a TypeError,
+    as writes into a copy of their values would be lost.
+    """
+    data = ds[name].variable.load().data
+    if not isinstance(data, np.ndarray):
+        raise TypeError(f'Variable {name!r} is backed by a {type(data).__name__}, not a numpy array.')
+    return data
+
+
 def populate_population_metadata(ds, populations):
     """
     Populate population metadata in the xarray dataset.
@@ -58,30 +130,32 @@ def populate_population_metadata(ds, populations):
         List of population objects from the simulation
     """
     particle_offset = 0
+    max_len = ds.sizes['name_strlen']
+    # Write into the underlying numpy arrays, bypassing xarray's indexing for every assignment
+    names = _numpy_data(ds, 'population_name')
+    particle_types = _numpy_data(ds, 'population_particle_type')
+    start_indices = _numpy_data(ds, 'population_start_idx')
+    counts = _numpy_data(ds, 'population_count')
+    population_ids = _numpy_data(ds, 'population_id')
+    trajectory_ids = _numpy_data(ds, 'trajectory_id')
 
     for pop_idx, population in enumerate(populations):
         # Population metadata
         pop_name = getattr(population, 'name', f'population_{pop_idx}')
-        max_len = ds.sizes['name_strlen']
-        truncated_name = pop_name[:max_len].ljust(max_len)
-        name_array = np.array(list(truncated_name), dtype='S1')
-        ds['population_name'][pop_idx, :] = name_array
+        names[pop_idx, :] = _char_array(pop_name, max_len)
 
-        ds['population_particle_type'][pop_idx] = getattr(population, 'particle_type', 0)
-        ds['population_start_idx'][pop_idx] = particle_offset
-        ds['population_count'][pop_idx] = len(population.particles['x'])
+        particle_types[pop_idx] = getattr(population, 'particle_type', 0)
+        start_indices[pop_idx] = particle_offset
+        num_particles = len(population.particles['x'])
+        counts[pop_idx] = num_particles
 
         # Assign population ID to particles
-        num_particles = len(population.particles['x'])
-        ds['population_id'][particle_offset : particle_offset + num_particles] = pop_idx
+        population_ids[particle_offset : particle_offset + num_particles] = pop_idx
 
-        # Generate trajectory IDs
-        for i in range(num_particles):
-            traj_id = f'traj_{particle_offset + i}'
-            max_len = ds.sizes['name_strlen']
-            truncated_traj_id = traj_id[:max_len].ljust(max_len)
-            traj_array = np.array(list(truncated_traj_id), dtype='S1')
-            ds['trajectory_id'][particle_offset + i, :] = traj_array
+        # Generate trajectory IDs for all particles of the population at once
+        trajectory_ids[particle_offset : particle_offset + num_particles, :] = _trajectory_ids(
+            particle_offset, particle_offset + num_particles, max_len
+        )
 
         particle_offset += num_particles
 
@@ -97,12 +171,11 @@ def populate_flowfield_metadata(ds, flow_field_names):
     flow_field_names : list
         List of flow field names
     """
+    max_len = ds.sizes['name_strlen']
+    names = _numpy_data(ds, 'flowfield_name')
     for ff_idx, ff_name in enumerate(flow_field_names):
         # Truncate name if it's longer than name_strlen, or pad if shorter
-        max_len = ds.sizes['name_strlen']
-        truncated_name = ff_name[:max_len].ljust(max_len)
-        name_array = np.array(list(truncated_name), dtype='S1')
-        ds['flowfield_name'][ff_idx, :] = name_array
+        names[ff_idx, :] = _char_array(ff_name, max_len)
 
 
 def collect_timestep_data(ds, populations, timestep, current_time):
@@ -120,38 +193,22 @@ def collect_timestep_data(ds, populations, timestep, current_time):
     current_time : float
         Current simulation time
     """
-    particle_offset = 0
-
-    for population in populations:
-        num_particles = len(population.particles['x'])
-        particle_slice = slice(particle_offset, particle_offset + num_particles)
-
-        # Core trajectory variables
-        ds['time'][particle_slice, timestep] = current_time
-        ds['x'][particle_slice, timestep] = population.particles['x']
-        ds['y'][particle_slice, timestep] = population.particles['y']
-        ds['z'][particle_slice, timestep] = population.particles.get('z', np.zeros(num_particles))
-        ds['burial_depth'][particle_slice, timestep] = population.particles['burial_depth']
-        # ds['mixing_depth'][particle_slice, timestep] = population.particles['mixing_depth'] # TODO: implement mixing depth tracking
-
-        # Status variables (assuming these exist in population.particles)
-        ds['status_alive'][particle_slice, timestep] = population.particles.get(
-            'status_alive', np.ones(num_particles, dtype=int)
-        )
-        ds['status_buried'][particle_slice, timestep] = population.particles.get(
-            'status_buried', np.zeros(num_particles, dtype=int)
-        )
-        ds['status_domain'][particle_slice, timestep] = population.particles.get(
-            'status_domain', np.ones(num_particles, dtype=int)
-        )
-        ds['status_transported'][particle_slice, timestep] = population.particles.get(
-            'status_transported', np.zeros(num_particles, dtype=int)
-        )
-        ds['status_released'][particle_slice, timestep] = population.particles.get(
-            'status_released', np.ones(num_particles, dtype=int)
-        )
-        ds['status_mobile'][particle_slice, timestep] = population.particles.get(
-            'status_mobile', np.zeros(num_particles, dtype=int)
-        )
-
-        particle_offset += num_particles
+    num_particles = sum(len(population.particles['x']) for population in populations)
+    # Write into the underlying numpy arrays, bypassing xarray's indexing for every assignment.
+    # Populations are stored back to back, so each variable is written for all populations at once
+    arrays = {
+        name: _numpy_data(ds, name)[:num_particles]
+        for name in ('time', 'x', 'y', 'z', 'burial_depth', *STATUS_DEFAULTS)
+    }
+
+    # Core trajectory variables
+    arrays['time'][:, timestep] = current_time
+    arrays['x'][:, timestep] = _concatenate_field(populations, 'x')
+    arrays['y'][:, timestep] = _concatenate_field(populations, 'y')
+    arrays['z'][:, timestep] = _concatenate_field(populations, 'z', 0.0)
+    arrays['burial_depth'][:, timestep] = _concatenate_field(populations, 'burial_depth')
+    # arrays['mixing_depth'][:, timestep] = _concatenate_field(populations, 'mixing_depth') # TODO: implement mixing depth tracking
+
+    # Status variables (assuming these exist in population.particles)
+    for name, default in STATUS_DEFAULTS.items():
+        arrays[name][:, timestep] = _concatenate_field(populations, name, default)
@@ -1,18 +1,37 @@
-
 """Custom exceptions go in this directory."""
 
 from .exceptions import (
     SedtrailsException,
     YamlParsingError,
-    YamlOutputError,
     YamlValidationError,
+    YamlOutputError,
+    ConfigurationError,
+    DateFormatError,
     MissingConfigurationParameter,
+    ZeroDuration,
+    DurationFormatError,
+    DataConversionError,
+    ParticleInitializationError,
+    NumbaCompilationError,
+    SimulationExecutionError,
+    VisualizationError,
+    OutputError,
 )
 
 __all__ = [
     'SedtrailsException',
     'YamlParsingError',
-    'YamlOutputError',
     'YamlValidationError',
+    'YamlOutputError',
+    'ConfigurationError',
+    'DateFormatError',
     'MissingConfigurationParameter',
+    'ZeroDuration',
+    'DurationFormatError',
+    'DataConversionError',
+    'ParticleInitializationError',
+    'NumbaCompilationError',
+    'SimulationExecutionError',
+    'VisualizationError',
+    'OutputError',
 ]
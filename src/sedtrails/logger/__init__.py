@@ -2,6 +2,6 @@
 A directory for the SedTRAILS Logger
 """
 
-from .logger import setup_logging, log_simulation_state
+from .logger import setup_logging, log_simulation_state, flush_logging
 
-__all__ = ['setup_logging', 'log_simulation_state']
+__all__ = ['setup_logging', 'log_simulation_state', 'flush_logging']
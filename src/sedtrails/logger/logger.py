@@ -4,53 +4,200 @@ SedTRAILS Logger
 A global logger for the SedTRAILS Particle Tracer System.
 """
 
+import copy
+import functools
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
+
+# Size of the write buffer of the log file, so bursts of records are written in large blocks
+LOG_BUFFER_SIZE = 128 * 1024
+
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes records through a large buffer (LOG_BUFFER_SIZE) and only flushes
+    it to the file when flushed explicitly, instead of after every record.
+
+    Meant to be used behind a QueueListenerHandler, whose background thread flushes the
+    handlers whenever it runs out of queued records.
+    """
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_BUFFER_SIZE, encoding=self.encoding, errors=self.errors)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # As logging.StreamHandler.emit, without the flush
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """
+    Formatter that formats the date and time of a second only once and reuses it for all
+    records logged within that second; only the milliseconds are formatted per record.
+    A custom ``datefmt`` is formatted per record, as by logging.Formatter.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._second = None
+        self._second_text = ''
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        if second != self._second:
+            self._second_text = time.strftime(self.default_time_format, self.converter(record.created))
+            self._second = second
+        return self.default_msec_format % (self._second_text, record.msecs)
+
+
+class _FlushRequest:
+    """
+    Marker put on the log queue by QueueListenerHandler.flush. The listener sets ``done`` once it has
+    handled all records queued before it and flushed its handlers.
+    """
+
+    __slots__ = ('done',)
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """
+    Queue listener that flushes its buffered file handlers whenever the queue runs empty, so a burst
+    of records is written at once and no record is left in a buffer while waiting for the next.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            for handler in self.handlers:
+                if isinstance(handler, BufferedFileHandler):
+                    handler.flush()
+        return super().dequeue(block)
+
+    def handle(self, record: logging.LogRecord | _FlushRequest) -> None:
+        if isinstance(record, _FlushRequest):
+            for handler in self.handlers:
+                handler.flush()
+            record.done.set()
+            return
+        super().handle(record)
+
+
+class QueueListenerHandler(logging.handlers.QueueHandler):
+    """
+    Handler that puts records on a queue, from which a background thread formats them and
+    passes them on to the actual (file and console) handlers. Logging then only costs the
+    caller an enqueue, independent of the speed of the disk or terminal.
+
+    Flushing waits until all queued records have been handled; closing also stops the
+    background thread and closes the actual handlers.
+
+    Parameters
+    ----------
+    *handlers : logging.Handler
+        The handlers that write the records.
+    """
+
+    def __init__(self, *handlers: logging.Handler) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.listener = _FlushingQueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self._listening = True
+        # Makes sure no flush request is queued after close() stopped the listener, it would never be handled
+        self._listener_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments into the message now, as they may be changed after the call returns.
+        # Records stay in this process, so the rest of the formatting (time, traceback) is left
+        # to the handlers on the background thread. The record is copied, as other handlers of
+        # the logger get the same record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def flush(self) -> None:
+        with self._listener_lock:
+            if not self._listening:
+                return
+            # The listener handles the records queued before the request, then flushes its handlers
+            request = _FlushRequest()
+            self.queue.put_nowait(request)
+        request.done.wait()
+
+    def close(self) -> None:
+        with self._listener_lock:
+            if self._listening:
+                self.listener.stop()
+                self._listening = False
+                for handler in self.listener.handlers:
+                    handler.close()
+        super().close()
 
 
 def setup_logging(output_dir: str, level: str = 'INFO') -> logging.Logger:
     """
     Configure global logging.
-    - Attaches handlers to the top-level 'sedtrails' logger
-    - Detects prior setup by checking handler markers
+    - Attaches handlers to the top-level 'sedtrails' logger; records are written to the
+      log file and console by a background thread (see QueueListenerHandler)
+    - Detects prior setup by checking handler markers; setting up the same output
+      directory and level again returns the configured logger as it is
     - Captures warnings and installs a global exception hook
     """
-    os.makedirs(output_dir, exist_ok=True)
-    logfile = os.path.join(output_dir, 'log.txt')
-
     logger = logging.getLogger('sedtrails')
+    logfile = os.path.join(os.path.abspath(output_dir), 'log.txt')
+    config = (logfile, level.upper())
 
-    # Remove handlers, so we do not append but overwrite the log file
+    # If our handlers are already present with this configuration, skip reconfiguration
+    if any(getattr(h, 'sedtrails_config', None) == config for h in logger.handlers):
+        return logger
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Remove handlers, so we do not append but overwrite the log file of a previous run.
+    # Only when the same log file is set up again (e.g. with another level) it is appended to
+    mode = 'w'
     for h in logger.handlers[:]:
+        if getattr(h, 'sedtrails_config', (None,))[0] == logfile:
+            mode = 'a'
         logger.removeHandler(h)
         try:
             h.close()
         except Exception:
             pass
 
-    # If our handlers are already present, skip reconfiguration
-    if any(getattr(h, 'is_sedtrails_handler', False) for h in logger.handlers):
-        return logger
-
     # Configure the 'sedtrails' logger (parents: sedtrails.* module loggers)
     numeric_level = getattr(logging, level.upper(), logging.INFO)
     logger.setLevel(numeric_level)
 
-    formatter = logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+    formatter = CachedTimeFormatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
 
-    # File handler
-    file_handler = logging.FileHandler(logfile, mode='w')  # Overwrite logs instead of appending
+    # File handler, buffered and flushed by the background thread when it runs out of records
+    file_handler = BufferedFileHandler(logfile, mode=mode)
     file_handler.setLevel(numeric_level)
     file_handler.setFormatter(formatter)
-    file_handler.is_sedtrails_handler = True  # marker to prevent duplicates
-    logger.addHandler(file_handler)
 
     console_handler = logging.StreamHandler(stream=sys.stdout)
     console_handler.setLevel(numeric_level)
     console_handler.setFormatter(formatter)
-    console_handler.is_sedtrails_handler = True  # marker to prevent duplicates
-    logger.addHandler(console_handler)
+
+    # Write the records from a background thread, off the caller's thread
+    queue_handler = QueueListenerHandler(file_handler, console_handler)
+    queue_handler.sedtrails_config = config  # marker to prevent duplicates
+    logger.addHandler(queue_handler)
 
     # Prevent propagation to root logger
     logger.propagate = False
@@ -59,7 +206,7 @@ def setup_logging(output_dir: str, level: str = 'INFO') -> logging.Logger:
     install_global_excepthook(logger)
 
     logger.info('=== LOGGING INITIALIZED ===')
-    logger.info(f'Log file: {os.path.abspath(logfile)}')
+    logger.info('Log file: %s', logfile)
     return logger
 
 
@@ -84,6 +231,15 @@ def install_global_excepthook(logger: logging.Logger) -> None:
     sys.excepthook = _hook
 
 
+def flush_logging(logger: logging.Logger | None = None) -> None:
+    """
+    Wait until all records logged so far have been written by the handlers of ``logger``
+    (default: the 'sedtrails' logger), e.g. before reading the log file.
+    """
+    for handler in (logger or logging.getLogger('sedtrails')).handlers:
+        handler.flush()
+
+
 def get_logger(name: str | None = None) -> logging.Logger:
     """
     Get a logger. Prefer logging.getLogger(__name__) in modules so logs
@@ -92,137 +248,202 @@ def get_logger(name: str | None = None) -> logging.Logger:
     return logging.getLogger(name or 'sedtrails')
 
 
+def _log_simulation_started(logger: logging.Logger, state: dict, level: int) -> None:
+    command = state.get('command', 'unknown')
+    config = state.get('config_file', 'unknown')
+    python_ver = state.get('python_version', 'unknown')
+    working_dir = state.get('working_directory', 'unknown')
+
+    # One record split into multiple lines
+    logger.log(
+        level,
+        '=== SIMULATION START ===\nCommand: %s\nPython: %s\nConfig: %s\nWorking directory: %s',
+        command,
+        python_ver,
+        config,
+        working_dir,
+    )
+
+
+def _log_config_loading(logger: logging.Logger, state: dict, level: int) -> None:
+    config_path = state.get('config_file_path', 'unknown')
+    logger.log(level, 'Loading configuration: %s', config_path)
+
+
+def _log_simulation_parameters(logger: logging.Logger, state: dict, level: int) -> None:
+    duration = state.get('duration', 'unknown')
+    timestep = state.get('timestep', 'unknown')
+    start_time = state.get('start_time', 'unknown')
+    strategy = state.get('seeding_strategy', 'unknown')
+    output_dir = state.get('output_dir', 'unknown')
+
+    # Format seeding strategy for readability
+    formatted_strategy = _format_seeding_strategy(strategy)
+
+    # One record with the parameters split into multiple lines
+    logger.log(
+        level,
+        '--- Simulation Parameters ---\nDuration: %s\nTime step: %s\nStart time: %s\nSeeding: %s\nOutput directory: %s',
+        duration,
+        timestep,
+        start_time,
+        formatted_strategy,
+        output_dir,
+    )
+
+
+def _log_particles_created(logger: logging.Logger, state: dict, level: int) -> None:
+    count = state.get('count', 1)
+    position = state.get('start_position', state.get('position', 'unknown'))
+    seeding_strategy = state.get('seeding_strategy', {})
+
+    # Format seeding strategy if provided
+    if seeding_strategy and seeding_strategy != {}:
+        formatted_strategy = _format_seeding_strategy(seeding_strategy)
+        logger.log(
+            level,
+            'Created %s particle(s)\nStarting position: %s\nSeeding method: %s',
+            count,
+            position,
+            formatted_strategy,
+        )
+    else:
+        logger.log(level, 'Created %s particle(s)\nStarting position: %s', count, position)
+
+
+def _log_data_conversion_completed(logger: logging.Logger, state: dict, level: int) -> None:
+    timesteps = state.get('num_timesteps', 'unknown')
+    field_name = state.get('flow_field_name', 'unknown')
+    duration = state.get('simulation_duration_seconds', 'unknown')
+    timestep = state.get('simulation_timestep_seconds', 'unknown')
+
+    logger.log(
+        level,
+        '--- Data Conversion Complete ---\nTimesteps: %s\nFlow field: %s\nDuration: %ss\nTime step: %ss',
+        timesteps,
+        field_name,
+        duration,
+        timestep,
+    )
+
+
+def _log_numba_compilation_started(logger: logging.Logger, state: dict, level: int) -> None:
+    grid_x = state.get('grid_size_x', 'unknown')
+    grid_y = state.get('grid_size_y', 'unknown')
+    logger.log(level, 'Compiling calculator for %sx%s grid', grid_x, grid_y)
+
+
+def _log_compilation_complete(logger: logging.Logger, state: dict, level: int) -> None:
+    time_sec = state.get('time_sec', 'unknown')
+    logger.log(level, 'Calculator compiled in %s seconds', time_sec)
+
+
+def _log_warmup_complete(logger: logging.Logger, state: dict, level: int) -> None:
+    time_sec = state.get('time_sec', 'unknown')
+    logger.log(level, 'JIT warmed up in %s seconds', time_sec)
+
+
+def _log_simulation_progress(logger: logging.Logger, state: dict, level: int) -> None:
+    progress = state.get('progress_pct', 0)
+    step = state.get('step', 0)
+    position = state.get('position', 'unknown')
+    logger.log(level, 'Progress: %s%% (step %s) at %s', progress, step, position)
+
+
+def _log_simulation_complete(logger: logging.Logger, state: dict, level: int) -> None:
+    steps = state.get('total_steps', 'unknown')
+    time_sec = state.get('total_time_sec', 'unknown')
+    final_pos = state.get('final_position', 'unknown')
+
+    logger.log(
+        level,
+        '=== SIMULATION COMPLETE ===\nTotal steps: %s\nRuntime: %ss\nFinal position: %s',
+        steps,
+        time_sec,
+        final_pos,
+    )
+
+
+def _log_visualization_saved(logger: logging.Logger, state: dict, level: int) -> None:
+    filename = state.get('file', 'trajectory plot')
+    output_path = state.get('output_plot_path', 'unknown')
+
+    if output_path != 'unknown':
+        logger.log(level, 'Visualization saved: %s\nLocation: %s', filename, output_path)
+    else:
+        logger.log(level, 'Visualization saved: %s', filename)
+
+
+def _log_creating_visualization(logger: logging.Logger, state: dict, level: int) -> None:
+    points = state.get('trajectory_points', 'unknown')
+    logger.log(level, 'Creating visualization with %s trajectory points', points)
+
+
+def _log_simulation_failed(logger: logging.Logger, state: dict, level: int) -> None:
+    error_type = state.get('error_type', 'unknown')
+    error_message = state.get('error_message', 'unknown')
+
+    logger.log(
+        level,
+        '=== SIMULATION FAILED ===\nError type: %s\nError message: %s\nCheck log above for full stack trace',
+        error_type,
+        error_message,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _status_title(status: str) -> str:
+    """Readable title of a status name, e.g. 'Particles Released' for 'particles_released'."""
+    return status.replace('_', ' ').title()
+
+
+def _log_unmapped_state(logger: logging.Logger, state: dict, level: int) -> None:
+    # Fallback for unmapped states
+    status = state.get('status', state.get('state', 'unknown'))
+    clean_status = _status_title(status)
+
+    # Log each parameter on separate line if many parameters, in one record
+    params = {k: v for k, v in state.items() if k not in ['status', 'state']}
+    if len(params) > 3:  # If more than 3 params, split them
+        param_str = '\n'.join([f'  {k}: {v}' for k, v in params.items()])
+        logger.log(level, 'Status: %s\n%s', clean_status, param_str)
+    elif params:  # If 3 or fewer, keep on one line
+        param_str = ', '.join([f'{k}: {v}' for k, v in params.items()])
+        logger.log(level, 'Status: %s\n  %s', clean_status, param_str)
+    else:
+        logger.log(level, 'Status: %s', clean_status)
+
+
+# Functions logging each simulation status, looked up by log_simulation_state
+_STATUS_HANDLERS = {
+    'simulation_started': _log_simulation_started,
+    'config_loading': _log_config_loading,
+    'simulation_parameters': _log_simulation_parameters,
+    'particles_created': _log_particles_created,
+    'particles_initialized': _log_particles_created,
+    'data_conversion_completed': _log_data_conversion_completed,
+    'numba_compilation_started': _log_numba_compilation_started,
+    'compilation_complete': _log_compilation_complete,
+    'warmup_complete': _log_warmup_complete,
+    'simulation_progress': _log_simulation_progress,
+    'simulation_complete': _log_simulation_complete,
+    'simulation_completed': _log_simulation_complete,
+    'visualization_saved': _log_visualization_saved,
+    'creating_visualization': _log_creating_visualization,
+    'simulation_failed': _log_simulation_failed,
+}
+
+
 def log_simulation_state(logger: logging.Logger, state: dict, level=logging.INFO) -> None:
     """
     Logs the current state of the simulation with human-readable sentences.
     Long messages are split into multiple lines for readability.
     """
+    # Skip gathering and formatting the state when its records would be dropped anyway
+    if not logger.isEnabledFor(level):
+        return
     status = state.get('status', state.get('state', 'unknown'))
-
-    # Create messages, split when necessary
-    if status == 'simulation_started':
-        command = state.get('command', 'unknown')
-        config = state.get('config_file', 'unknown')
-        python_ver = state.get('python_version', 'unknown')
-        working_dir = state.get('working_directory', 'unknown')
-
-        # Split into multiple log lines
-        logger.log(level, '=== SIMULATION START ===')
-        logger.log(level, f'Command: {command}')
-        logger.log(level, f'Python: {python_ver}')
-        logger.log(level, f'Config: {config}')
-        logger.log(level, f'Working directory: {working_dir}')
-
-    elif status == 'config_loading':
-        config_path = state.get('config_file_path', 'unknown')
-        logger.log(level, f'Loading configuration: {config_path}')
-
-    elif status == 'simulation_parameters':
-        duration = state.get('duration', 'unknown')
-        timestep = state.get('timestep', 'unknown')
-        start_time = state.get('start_time', 'unknown')
-        strategy = state.get('seeding_strategy', 'unknown')
-        output_dir = state.get('output_dir', 'unknown')
-
-        # Format seeding strategy for readability
-        formatted_strategy = _format_seeding_strategy(strategy)
-
-        # Split parameters into multiple lines
-        logger.log(level, '--- Simulation Parameters ---')
-        logger.log(level, f'Duration: {duration}')
-        logger.log(level, f'Time step: {timestep}')
-        logger.log(level, f'Start time: {start_time}')
-        logger.log(level, f'Seeding: {formatted_strategy}')
-        logger.log(level, f'Output directory: {output_dir}')
-
-    elif status == 'particles_created' or status == 'particles_initialized':
-        count = state.get('count', 1)
-        position = state.get('start_position', state.get('position', 'unknown'))
-        seeding_strategy = state.get('seeding_strategy', {})
-
-        logger.log(level, f'Created {count} particle(s)')
-        logger.log(level, f'Starting position: {position}')
-
-        # Format seeding strategy if provided
-        if seeding_strategy and seeding_strategy != {}:
-            formatted_strategy = _format_seeding_strategy(seeding_strategy)
-            logger.log(level, f'Seeding method: {formatted_strategy}')
-
-    elif status == 'data_conversion_completed':
-        timesteps = state.get('num_timesteps', 'unknown')
-        field_name = state.get('flow_field_name', 'unknown')
-        duration = state.get('simulation_duration_seconds', 'unknown')
-        timestep = state.get('simulation_timestep_seconds', 'unknown')
-
-        logger.log(level, '--- Data Conversion Complete ---')
-        logger.log(level, f'Timesteps: {timesteps}')
-        logger.log(level, f'Flow field: {field_name}')
-        logger.log(level, f'Duration: {duration}s')
-        logger.log(level, f'Time step: {timestep}s')
-
-    elif status == 'numba_compilation_started':
-        grid_x = state.get('grid_size_x', 'unknown')
-        grid_y = state.get('grid_size_y', 'unknown')
-        logger.log(level, f'Compiling calculator for {grid_x}x{grid_y} grid')
-
-    elif status == 'compilation_complete':
-        time_sec = state.get('time_sec', 'unknown')
-        logger.log(level, f'Calculator compiled in {time_sec} seconds')
-
-    elif status == 'warmup_complete':
-        time_sec = state.get('time_sec', 'unknown')
-        logger.log(level, f'JIT warmed up in {time_sec} seconds')
-
-    elif status == 'simulation_progress':
-        progress = state.get('progress_pct', 0)
-        step = state.get('step', 0)
-        position = state.get('position', 'unknown')
-        logger.log(level, f'Progress: {progress}% (step {step}) at {position}')
-
-    elif status == 'simulation_complete' or status == 'simulation_completed':
-        steps = state.get('total_steps', 'unknown')
-        time_sec = state.get('total_time_sec', 'unknown')
-        final_pos = state.get('final_position', 'unknown')
-
-        logger.log(level, '=== SIMULATION COMPLETE ===')
-        logger.log(level, f'Total steps: {steps}')
-        logger.log(level, f'Runtime: {time_sec}s')
-        logger.log(level, f'Final position: {final_pos}')
-
-    elif status == 'visualization_saved':
-        filename = state.get('file', 'trajectory plot')
-        output_path = state.get('output_plot_path', 'unknown')
-
-        logger.log(level, f'Visualization saved: {filename}')
-        if output_path != 'unknown':
-            logger.log(level, f'Location: {output_path}')
-
-    elif status == 'creating_visualization':
-        points = state.get('trajectory_points', 'unknown')
-        logger.log(level, f'Creating visualization with {points} trajectory points')
-
-    elif status == 'simulation_failed':
-        error_type = state.get('error_type', 'unknown')
-        error_message = state.get('error_message', 'unknown')
-
-        logger.log(level, '=== SIMULATION FAILED ===')
-        logger.log(level, f'Error type: {error_type}')
-        logger.log(level, f'Error message: {error_message}')
-        logger.log(level, 'Check log above for full stack trace')
-
-    else:
-        # Fallback for unmapped states
-        clean_status = status.replace('_', ' ').title()
-        logger.log(level, f'Status: {clean_status}')
-
-        # Log each parameter on separate line if many parameters
-        params = {k: v for k, v in state.items() if k not in ['status', 'state']}
-        if len(params) > 3:  # If more than 3 params, split them
-            for k, v in params.items():
-                logger.log(level, f'  {k}: {v}')
-        elif params:  # If 3 or fewer, keep on one line
-            param_str = ', '.join(f'{k}: {v}' for k, v in params.items())
-            logger.log(level, f'  {param_str}')
+    _STATUS_HANDLERS.get(status, _log_unmapped_state)(logger, state, level)
 
 
 def log_exception(logger: logging.Logger, e: Exception, context: str = None) -> None:
@@ -238,12 +459,12 @@ def log_exception(logger: logging.Logger, e: Exception, context: str = None) ->
     """
     # Log exception with context
     if context:
-        logger.error(f'=== ERROR: {context} ===')
+        logger.error('=== ERROR: %s ===', context)
     else:
         logger.error('=== SIMULATION ERROR ===')
 
-    logger.error(f'Exception type: {type(e).__name__}')
-    logger.error(f'Exception message: {str(e)}')
+    logger.error('Exception type: %s', type(e).__name__)
+    logger.error('Exception message: %s', e)
     logger.error('Stack trace:', exc_info=True)
     logger.error('=' * 50)
 
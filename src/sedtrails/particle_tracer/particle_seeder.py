@@ -368,6 +368,7 @@ class ParticlePopulation:
     _current_time: ndarray = field(init=False)
     _field_mixing_depth: ndarray = field(init=False)  # TODO: we're not using this field yet
     _field_transport_probability: ndarray = field(init=False)  # TODO: we're not using this field yet
+    _size: int = field(init=False, default=0)
 
     def __post_init__(self):
         # Create a Numba calculator for particle operations
@@ -384,12 +385,20 @@ class ParticlePopulation:
             'release_time': np.array([p.release_time for p in _particles]),
             'burial_depth': np.array([p.burial_depth for p in _particles]),
         }
+        self._size = len(_particles)
 
         # store the outer envelope of the domain
         coords = np.column_stack((self.field_x, self.field_y))
         hull = ConvexHull(coords)
         self._outer_envelope = Path(coords[hull.vertices])
 
+    @property
+    def size(self) -> int:
+        """
+        Number of particles in the population, fixed when the population is seeded.
+        """
+        return self._size
+
     def update_information(
         self, current_time: ndarray, mixing_depth: ndarray, transport_probability: ndarray, bed_level: ndarray
     ) -> None:
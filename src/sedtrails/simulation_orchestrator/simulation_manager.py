@@ -303,7 +303,7 @@ class Simulation:
                 break  # Use the first population's flow fields for now
 
         # Create SedTrails dataset using DataManager's writer (composition)
-        total_particles = sum([len(pop.particles['x']) for pop in populations])
+        total_particles = sum(pop.size for pop in populations)
         max_timesteps = (simulation_time.duration.seconds // simulation_time.time_step.seconds) + 1
 
         xr_data = self.data_manager.writer.create_dataset(
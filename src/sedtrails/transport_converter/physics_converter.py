@@ -7,6 +7,7 @@ using the physics library functions and allowing method selection.
 
 from typing import Optional, Any, Dict
 from dataclasses import dataclass, asdict
+from functools import lru_cache
 
 # Import physics library
 from sedtrails.transport_converter import physics_lib
@@ -23,6 +24,50 @@ GRAIN_DIAMETER = 2.5e-4  # m (250 μm)
 # Morphological acceleration factor
 MORFAC = 1.0
 
+# Entry point group under which physics plugins are registered
+PHYSICS_PLUGIN_GROUP = 'sedtrails.physics'
+
+
+@lru_cache(maxsize=None)
+def get_physics_plugin(tracer_method: str) -> type:
+    """
+    Returns the physics plugin class for a tracer method.
+
+    Plugins are looked up in the 'sedtrails.physics' entry point group. When the
+    package metadata does not provide the entry point (e.g., running from a source
+    tree), the plugin module is imported from the physics plugins package instead.
+    The plugin class is resolved once per tracer method.
+
+    Parameters:
+    -----------
+    tracer_method : str
+        The name of the tracer method (e.g., 'vanwesten', 'soulsby').
+
+    Returns:
+    --------
+    type
+        The PhysicsPlugin class implementing the tracer method.
+    """
+
+    from importlib.metadata import entry_points  # lazy import for performance
+
+    plugin_entry_points = entry_points(group=PHYSICS_PLUGIN_GROUP, name=tracer_method)
+    if plugin_entry_points:
+        return next(iter(plugin_entry_points)).load()
+
+    import importlib  # lazy import for performance
+
+    plugin_module_name = f'sedtrails.transport_converter.plugins.physics.{tracer_method}'
+    try:
+        plugin_module = importlib.import_module(plugin_module_name)
+    except ImportError as e:
+        raise ImportError(
+            f'Failed to import physics plugin module: {plugin_module_name} '
+            f'Ensure the module exists and is correctly named.'
+        ) from e
+    return plugin_module.PhysicsPlugin  # all classes should be called the PhysicsPlugin
+
+
 @dataclass
 class PhysicsConfig:
     """Configuration parameters for physics calculations."""
@@ -127,22 +172,11 @@ class PhysicsConverter:
             The tracer method to use for physics calculations. If None, uses the configured method.
         """
 
-        import importlib  # lazy import for performance
-
         if self._physics_plugin is None:
             if tracer_method is None:
                 tracer_method = self.config.tracer_method
-                # Dynamically import the physics plugin based on the configured method
-            plugin_module_name = f'sedtrails.transport_converter.plugins.physics.{tracer_method}'
-            try:
-                plugin_module = importlib.import_module(plugin_module_name)
-            except ImportError as e:
-                raise ImportError(
-                    f'Failed to import physics plugin module: {plugin_module_name} '
-                    f'Ensure the module exists and is correctly named.'
-                ) from e
-            else:
-                self._physics_plugin = plugin_module.PhysicsPlugin(self.config, self.tracer_config)  # all classes should be called the PhysicsPlugin
+            plugin_class = get_physics_plugin(tracer_method)
+            self._physics_plugin = plugin_class(self.config, self.tracer_config)
         return self._physics_plugin
 
 
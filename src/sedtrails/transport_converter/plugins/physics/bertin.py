@@ -8,6 +8,8 @@ class PhysicsPlugin(BasePhysicsPlugin):
     This plugin implements the physics calculations as described in Bertin et al. (2023).
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
     ):  # this is the minimum required for the plugin to work. Additional parameters can be added as needed.
@@ -12,6 +12,8 @@ class BasePhysicsPlugin(ABC):
     Abstract base class for physics plugins.
     """
 
+    __slots__ = ()
+
     def __init__(self):
         return None
 
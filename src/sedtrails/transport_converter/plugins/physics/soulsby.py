@@ -12,6 +12,8 @@ class PhysicsPlugin(BasePhysicsPlugin):  # all clases should be called the Physi
     This plugin implements the physics calculations as described in Soulsby et al. (2011).
     """
 
+    __slots__ = ('config',)
+
     def __init__(self, config, tracer_config):
         super().__init__()
         self.config = config
@@ -12,6 +12,8 @@ class PhysicsPlugin(BasePhysicsPlugin):  # all clases should be called the Physi
     This plugin implements the physics calculations as described in van Westen et al. (2025).
     """
 
+    __slots__ = ('config',)
+
     def __init__(self, config, tracer_methods: None):
         super().__init__()
         self.config = config
@@ -67,6 +67,31 @@ class TestYAMLConfigValidator:
         result = validator._apply_defaults(schema, config)
         assert result == [{'x': 2}, {'x': 1}]
 
+    def test_apply_defaults_conditionals(self, validator):
+        schema = {
+            'type': 'object',
+            'allOf': [{'type': 'object', 'properties': {'a': {'type': 'string', 'default': 'foo'}}}],
+            'anyOf': [
+                {'type': 'object', 'required': ['b'], 'properties': {'c': {'type': 'number', 'default': 1}}},
+                {'type': 'object', 'required': ['x'], 'properties': {'d': {'type': 'number', 'default': 2}}},
+            ],
+            'properties': {'b': {'type': 'number', 'default': 42}},
+        }
+        result = validator._apply_defaults(schema, {'b': 0})
+        assert result == {'a': 'foo', 'b': 0, 'c': 1}
+
+    def test_apply_defaults_local_ref(self, validator):
+        schema = {'$ref': '#/$defs/input_model_type'}
+        result = validator._apply_defaults(schema, {})
+        assert result['format'] == 'fm_netcdf'
+
+    def test_validator_shared_across_instances(self, validator):
+        """
+        Test that the compiled schema is shared between validator instances
+        """
+        other = YAMLConfigValidator()
+        assert other.schema_content is validator.schema_content
+
     # -----------------------------
     # Tests for validate_yaml
     # -----------------------------
@@ -1,6 +1,9 @@
+import time
+import pytest
 import numpy as np
 import xarray as xr
 from sedtrails.data_manager.manager import DataManager
+from sedtrails.data_manager.simulation_buffer import SimulationDataBuffer
 
 
 def create_test_mesh():
@@ -37,6 +40,20 @@ def test_add_data_and_write(tmp_path):
     ds.close()
 
 
+def test_add_batch_and_write(tmp_path):
+    """
+    Test that DataManager buffers a batch of data and writes it to disk when requested.
+    """
+    dm = DataManager(tmp_path)
+    dm.set_mesh(*create_test_mesh())
+    dm.add_batch(np.arange(3), 0.0, np.array([10.0, 11.0, 12.0]), np.array([20.0, 21.0, 22.0]))
+    dm.write('test_manager_batch.nc')
+    ds = xr.open_dataset(dm.writer.output_dir / 'test_manager_batch.nc')
+    assert ds.particle_id.values.tolist() == [0, 1, 2]
+    assert ds.x.values.tolist() == [10.0, 11.0, 12.0]
+    ds.close()
+
+
 def test_buffer_limit_triggers_write(tmp_path):
     """
     Test that DataManager writes to disk automatically when buffer exceeds memory limit.
@@ -49,6 +66,7 @@ def test_buffer_limit_triggers_write(tmp_path):
     for i in range(100):
         dm.add_data(i, float(i), float(i), float(i))
     # The first file should have been written
+    dm.wait_for_writes()
     output_dir = dm.writer.output_dir
     expected_file = output_dir / '.sim_buffer_0.nc'
     assert expected_file.exists()
@@ -77,3 +95,197 @@ def test_merge(tmp_path):
     ds = xr.open_dataset(merged_file)
     assert len(ds.time) == 10
     ds.close()
+
+
+def test_zarr_output_format_dump(tmp_path):
+    """
+    Test that the 'zarr' output format appends flushes to one store and dumps it to a single NetCDF file.
+    """
+    pytest.importorskip('zarr')
+    dm = DataManager(tmp_path, output_format='zarr')
+    dm.set_mesh(*create_test_mesh())
+    for i in range(5):
+        dm.add_data(i, float(i), float(i), float(i))
+    dm.write()
+    for i in range(5, 10):
+        dm.add_data(i, float(i), float(i), float(i))
+    final_file = dm.dump(merged_filename='zarr_output.nc')
+    assert not dm.zarr_store.exists()
+    ds = xr.open_dataset(final_file)
+    assert ds.particle_id.values.tolist() == list(range(10))
+    ds.close()
+
+
+def test_unknown_output_format(tmp_path):
+    """
+    Test that DataManager rejects unknown output formats.
+    """
+    with pytest.raises(ValueError):
+        DataManager(tmp_path, output_format='hdf4')
+
+
+def test_dump_merges_and_cleans_up_chunks(tmp_path):
+    """
+    Test that DataManager.dump merges the chunk files and deletes them afterwards.
+    """
+    dm = DataManager(tmp_path)
+    dm.set_mesh(*create_test_mesh())
+    for chunk in range(10):
+        dm.add_data(chunk, float(chunk), 0.0, 0.0)
+        dm.write()
+    final_file = dm.dump()
+    assert not list(dm.output_dir.glob('.sim_buffer_*.nc'))
+    ds = xr.open_dataset(final_file)
+    assert ds.particle_id.values.tolist() == list(range(10))
+    ds.close()
+
+
+def test_background_flushes_are_merged_in_order(tmp_path):
+    """
+    Test that chunks flushed in the background because of the memory limit all end up in the merged file, in order.
+    """
+    dm = DataManager(tmp_path, max_bytes=10 * SimulationDataBuffer.ROW_NBYTES)
+    dm.set_mesh(*create_test_mesh())
+    for i in range(100):
+        dm.add_data(i, float(i), float(i), float(i))
+    ds = xr.open_dataset(dm.dump())
+    assert ds.particle_id.values.tolist() == list(range(100))
+    ds.close()
+
+
+def test_background_flushes_one_chunk_in_flight(tmp_path, monkeypatch):
+    """
+    Test that a flush waits for the previous chunk to be written, and re-raises its errors.
+    """
+    dm = DataManager(tmp_path, max_bytes=10 * SimulationDataBuffer.ROW_NBYTES)
+    dm.set_mesh(*create_test_mesh())
+    write_arrays = dm.writer.write_arrays
+    written = []
+
+    def slow_write_arrays(data, filename):
+        written.append(filename)
+        time.sleep(0.01)
+        return write_arrays(data, filename)
+
+    monkeypatch.setattr(dm.writer, 'write_arrays', slow_write_arrays)
+    for i in range(50):
+        dm.add_data(i, float(i), float(i), float(i))
+        assert len(dm._write_futures) <= 1
+    dm.wait_for_writes()
+    assert written == [f'.sim_buffer_{i}.nc' for i in range(4)]
+
+    def failing_write_arrays(data, filename):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(dm.writer, 'write_arrays', failing_write_arrays)
+    for i in range(11):
+        dm.add_data(i, float(i), float(i), float(i))
+    with pytest.raises(OSError, match='disk full'):
+        for i in range(11):
+            dm.add_data(i, float(i), float(i), float(i))
+
+
+def test_dump_single_chunk_is_renamed(tmp_path):
+    """
+    Test that DataManager.dump moves a single chunk file to the final output instead of merging it.
+    """
+    dm = DataManager(tmp_path)
+    dm.set_mesh(*create_test_mesh())
+    dm.add_batch(np.arange(3), 0.0, np.zeros(3), np.ones(3))
+    final_file = dm.dump()
+    assert not list(dm.output_dir.glob('.sim_buffer_*.nc'))
+    ds = xr.open_dataset(final_file)
+    assert ds.particle_id.values.tolist() == [0, 1, 2]
+    ds.close()
+
+
+def test_netcdf_append_output_format(tmp_path):
+    """
+    Test that the 'netcdf_append' output format appends all flushes to one open file that becomes the final output.
+    """
+    dm = DataManager(tmp_path, max_bytes=10 * SimulationDataBuffer.ROW_NBYTES, output_format='netcdf_append')
+    dm.set_mesh(*create_test_mesh())
+    for i in range(100):
+        dm.add_data(i, float(i), float(i), float(i))
+    final_file = dm.dump(merged_filename='appended.nc')
+    assert not dm.append_file_path.exists()
+    assert not list(dm.output_dir.glob('.sim_buffer_*.nc'))
+    ds = xr.open_dataset(final_file)
+    assert ds.particle_id.values.tolist() == list(range(100))
+    assert ds.x.values.tolist() == [float(i) for i in range(100)]
+    ds.close()
+
+
+def test_netcdf_append_output_format_keeps_rows_across_merge(tmp_path):
+    """
+    Test that data appended after a mid-run merge() or dump(merge=False) is added to the rows written before.
+    """
+    dm = DataManager(tmp_path, max_bytes=10 * SimulationDataBuffer.ROW_NBYTES, output_format='netcdf_append')
+    dm.set_mesh(*create_test_mesh())
+    for i in range(50):
+        dm.add_data(i, float(i), float(i), float(i))
+    dm.merge('intermediate.nc')
+    for i in range(50, 80):
+        dm.add_data(i, float(i), float(i), float(i))
+    dm.dump(merge=False)
+    for i in range(80, 100):
+        dm.add_data(i, float(i), float(i), float(i))
+    final_file = dm.dump(merged_filename='appended.nc')
+
+    ds = xr.open_dataset(final_file)
+    assert ds.particle_id.values.tolist() == list(range(100))
+    ds.close()
+    # The intermediate merge holds the rows flushed before it
+    ds = xr.open_dataset(dm.output_dir / 'intermediate.nc')
+    assert 0 < ds.sizes['time'] <= 50
+    assert ds.particle_id.values.tolist() == list(range(ds.sizes['time']))
+    ds.close()
+
+
+def test_collect_timestep_data(tmp_path):
+    """
+    Test that DataManager.collect_timestep_data writes a timestep of all populations into the dataset,
+    filling in defaults for fields a population does not have.
+    """
+
+    class Population:
+        def __init__(self, x):
+            self.particles = {'x': x, 'y': x + 1.0, 'burial_depth': np.zeros_like(x), 'status_mobile': np.ones(len(x))}
+
+    dm = DataManager(tmp_path)
+    dataset = dm.writer.create_dataset(N_particles=3, N_populations=2, N_timesteps=2, N_flowfields=1)
+    populations = [Population(np.array([1.0, 2.0])), Population(np.array([3.0]))]
+    dm.collect_timestep_data(dataset, populations, 1, 60.0)
+    # Populations without a field get its default
+    populations[0].particles['z'] = np.array([-1.0, -2.0])
+    dm.collect_timestep_data(dataset, populations, 0, 0.0)
+
+    assert dataset['x'].values[:, 1].tolist() == [1.0, 2.0, 3.0]
+    assert dataset['y'].values[:, 1].tolist() == [2.0, 3.0, 4.0]
+    assert dataset['time'].values[:, 1].tolist() == [60.0] * 3
+    assert dataset['z'].values[:, 1].tolist() == [0.0] * 3
+    assert dataset['status_mobile'].values[:, 1].tolist() == [1, 1, 1]
+    assert dataset['status_alive'].values[:, 1].tolist() == [1, 1, 1]
+    assert dataset['status_buried'].values[:, 1].tolist() == [0, 0, 0]
+    assert dataset['z'].values[:, 0].tolist() == [-1.0, -2.0, 0.0]
+    assert dataset['x'].values[:, 0].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_collect_timestep_data_into_dask_dataset(tmp_path):
+    """
+    Test that DataManager.collect_timestep_data writes into a dataset whose variables are dask arrays.
+    """
+    pytest.importorskip('dask')
+
+    class Population:
+        def __init__(self, x):
+            self.particles = {'x': x, 'y': x + 1.0, 'burial_depth': np.zeros_like(x)}
+
+    dm = DataManager(tmp_path)
+    dataset = dm.writer.create_dataset(N_particles=2, N_populations=1, N_timesteps=2, N_flowfields=1).chunk()
+    dm.collect_timestep_data(dataset, [Population(np.array([1.0, 2.0]))], 1, 60.0)
+
+    assert dataset['x'].values[:, 1].tolist() == [1.0, 2.0]
+    assert dataset['y'].values[:, 1].tolist() == [2.0, 3.0]
+    assert dataset['time'].values[:, 1].tolist() == [60.0, 60.0]
+    assert dataset['status_alive'].values[:, 1].tolist() == [1, 1]
@@ -38,3 +38,13 @@ def test_is_limit_exceeded():
 
     assert not mm.is_limit_exceeded(small_buffer)  # Should be under limit
     assert mm.is_limit_exceeded(large_buffer)  # Should exceed limit
+
+
+def test_is_limit_exceeded_with_byte_count():
+    """
+    Test that is_limit_exceeded accepts the buffer size in bytes.
+    """
+    mm = MemoryManager(max_bytes=100)
+
+    assert not mm.is_limit_exceeded(100)
+    assert mm.is_limit_exceeded(101)
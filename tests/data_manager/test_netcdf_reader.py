@@ -52,4 +52,25 @@ def test_supported_extensions(monkeypatch, tmp_path, ext):
     monkeypatch.setattr(xu, "open_dataset", lambda path: DummyDataset(str(f)))
 
     reader = NetCDFReader(str(f))
-    assert reader.data.path == str(f)
\ No newline at end of file
+    assert reader.data.path == str(f)
+
+
+def test_invalid_content(tmp_path):
+    """A .nc file that is not NetCDF should raise ValueError when it is read."""
+    f = tmp_path / "broken.nc"
+    f.write_text("not netcdf")
+    with pytest.raises(ValueError):
+        NetCDFReader(str(f))
+
+
+def test_valid_nc_opened_once(monkeypatch, tmp_path):
+    """The file is opened once, without a separate validation open."""
+    nc = tmp_path / "once.nc"
+    nc.write_text("placeholder")
+
+    import xugrid as xu
+    calls = []
+    monkeypatch.setattr(xu, "open_dataset", lambda path: calls.append(path) or DummyDataset(path))
+
+    NetCDFReader(str(nc))
+    assert calls == [str(nc)]
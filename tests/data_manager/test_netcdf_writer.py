@@ -1,3 +1,5 @@
+import time
+from datetime import datetime
 import pytest
 import xarray as xr
 import numpy as np
@@ -46,6 +48,12 @@ def test_netcdf_writer_creates_dataset(tmp_output_dir):
     assert dataset.sizes['n_populations'] == 2
     assert dataset.sizes['n_timesteps'] == 5
     assert dataset.sizes['n_flowfields'] == 1
+    # Integer flags and indices are stored as int32
+    assert dataset['status_mobile'].dtype == np.int32
+    assert dataset['population_id'].dtype == np.int32
+    # Positions and time are double precision, depths and distances single precision
+    assert dataset['x'].dtype == dataset['y'].dtype == dataset['time'].dtype == np.float64
+    assert dataset['z'].dtype == dataset['burial_depth'].dtype == dataset['covered_distance'].dtype == np.float32
 
 
 def test_netcdf_writer_adds_metadata(tmp_output_dir):
@@ -71,6 +79,29 @@ def test_netcdf_writer_adds_metadata(tmp_output_dir):
     assert dataset.attrs['test_attr'] == 'test_value'
     assert 'created_on' in dataset.attrs
 
+    # Check the character arrays of the names and trajectory IDs
+    assert dataset['population_name'].values[0].tobytes() == b'test_pop'.ljust(24)
+    assert dataset['flowfield_name'].values[0].tobytes() == b'water_velocity'.ljust(24)
+    assert [row.tobytes().strip() for row in dataset['trajectory_id'].values] == [b'traj_0', b'traj_1', b'traj_2']
+    assert dataset['population_count'].values.tolist() == [3]
+    assert dataset['population_start_idx'].values.tolist() == [0]
+    assert dataset['population_id'].values.tolist() == [0, 0, 0]
+
+
+def test_netcdf_writer_adds_metadata_to_dask_dataset(tmp_output_dir):
+    """
+    Test that population and flow field metadata is written into a dataset whose variables are dask arrays.
+    """
+    pytest.importorskip('dask')
+    writer = NetCDFWriter(tmp_output_dir)
+    dataset = writer.create_dataset(N_particles=3, N_populations=1, N_timesteps=2, N_flowfields=1).chunk()
+    writer.add_metadata(dataset, [MockPopulation('test_pop')], ['water_velocity'])
+
+    assert dataset['population_name'].values[0].tobytes() == b'test_pop'.ljust(24)
+    assert dataset['flowfield_name'].values[0].tobytes() == b'water_velocity'.ljust(24)
+    assert [row.tobytes().strip() for row in dataset['trajectory_id'].values] == [b'traj_0', b'traj_1', b'traj_2']
+    assert dataset['population_count'].values.tolist() == [3]
+
 
 def test_netcdf_writer_writes_file(tmp_output_dir):
     """
@@ -127,6 +158,10 @@ def test_netcdf_writer_writes_with_trimming(tmp_output_dir):
     assert loaded_dataset.sizes['n_timesteps'] == 2  # Should be trimmed from 5 to 2
     loaded_dataset.close()
 
+    # The number of timesteps to keep is required for trimming
+    with pytest.raises(ValueError):
+        writer.write(dataset, filename, trim_to_actual_timesteps=True)
+
 
 def test_netcdf_writer_create_and_write_simulation_results(tmp_output_dir):
     """
@@ -153,3 +188,110 @@ def test_netcdf_writer_create_and_write_simulation_results(tmp_output_dir):
     assert loaded_dataset.sizes['n_populations'] == 2
     assert loaded_dataset.sizes['n_flowfields'] == 1
     loaded_dataset.close()
+
+
+def test_netcdf_writer_chunks_along_timesteps(tmp_output_dir):
+    """
+    Test that trajectory variables are written in chunks spanning all particles.
+    """
+    writer = NetCDFWriter(tmp_output_dir)
+    dataset = writer.create_dataset(N_particles=1000, N_populations=1, N_timesteps=300, N_flowfields=1)
+
+    output_path = writer.write(dataset, 'chunked.nc')
+
+    loaded_dataset = xr.open_dataset(output_path)
+    # 1 MB of float64 values over 1000 particles gives 131 timesteps per chunk, of float32 values 262
+    assert loaded_dataset['x'].encoding['chunksizes'] == (1000, 131)
+    assert loaded_dataset['covered_distance'].encoding['chunksizes'] == (1, 1000, 262)
+    loaded_dataset.close()
+
+
+def test_netcdf_writer_compresses_chunks(tmp_output_dir):
+    """
+    Test that chunked variables are compressed, and positions are only quantized on request.
+    """
+    writer = NetCDFWriter(tmp_output_dir)
+    dataset = writer.create_dataset(N_particles=10, N_populations=1, N_timesteps=5, N_flowfields=1)
+    dataset['x'][:] = 1.23456789
+
+    loaded_dataset = xr.open_dataset(writer.write(dataset, 'compressed.nc'))
+    assert loaded_dataset['x'].encoding['zlib']
+    assert loaded_dataset['x'].encoding['shuffle']
+    assert loaded_dataset['x'].encoding['complevel'] == 1
+    assert float(loaded_dataset['x'][0, 0]) == 1.23456789
+    loaded_dataset.close()
+
+    loaded_dataset = xr.open_dataset(writer.write(dataset, 'quantized.nc', least_significant_digit=3))
+    assert abs(float(loaded_dataset['x'][0, 0]) - 1.23456789) < 1e-3
+    assert float(loaded_dataset['x'][0, 0]) != 1.23456789
+    loaded_dataset.close()
+
+
+def test_netcdf_writer_write_arrays(tmp_output_dir):
+    """
+    Test that arrays written directly with netCDF4 read back as an xarray dataset with a time coordinate.
+    """
+    writer = NetCDFWriter(tmp_output_dir)
+    data = {
+        'particle_id': np.arange(4, dtype=np.int32),
+        'time': np.array([0.0, 0.0, 1.0, 1.0]),
+        'x': np.array([1.5, 2.5, 3.5, 4.5], dtype=np.float32),
+    }
+
+    loaded_dataset = xr.open_dataset(writer.write_arrays(data, 'arrays.nc'))
+    assert list(loaded_dataset.coords) == ['time']
+    assert loaded_dataset['particle_id'].values.tolist() == [0, 1, 2, 3]
+    assert loaded_dataset['x'].dtype == np.float32
+    assert loaded_dataset['x'].encoding['zlib']
+    assert not loaded_dataset.encoding['unlimited_dims']
+    loaded_dataset.close()
+
+
+def test_netcdf_writer_created_on_per_file(tmp_output_dir):
+    """
+    Test that each file written by the same writer records the time it was created.
+    """
+    writer = NetCDFWriter(tmp_output_dir)
+    data = {'particle_id': np.arange(2, dtype=np.int32), 'time': np.array([0.0, 1.0])}
+    created_on = []
+    for filename in ('first.nc', 'second.nc'):
+        with xr.open_dataset(writer.write_arrays(data, filename)) as loaded_dataset:
+            created_on.append(datetime.fromisoformat(loaded_dataset.attrs['created_on']))
+        time.sleep(0.01)
+    assert created_on[0] < created_on[1]
+
+
+def test_netcdf_writer_compression_options(tmp_output_dir):
+    """
+    Test the compression filter and significant digits set on the writer, and rejection of unknown filters.
+    """
+    writer = NetCDFWriter(tmp_output_dir, compression='zstd', significant_digits=3)
+    dataset = writer.create_dataset(N_particles=10, N_populations=1, N_timesteps=5, N_flowfields=1)
+    dataset['x'][:] = 1.23456789
+
+    loaded_dataset = xr.open_dataset(writer.write(dataset, 'zstd.nc'))
+    assert loaded_dataset['x'].encoding['zstd']
+    assert abs(float(loaded_dataset['x'][0, 0]) - 1.23456789) < 1e-2
+    assert float(loaded_dataset['x'][0, 0]) != 1.23456789
+    loaded_dataset.close()
+
+    with pytest.raises(ValueError):
+        NetCDFWriter(tmp_output_dir, compression='lzma')
+
+
+def test_netcdf_writer_keeps_variable_encoding(tmp_output_dir):
+    """
+    Test that the packing and fill value set in a variable's encoding survive chunking and compression.
+    """
+    writer = NetCDFWriter(tmp_output_dir)
+    dataset = writer.create_dataset(N_particles=4, N_populations=1, N_timesteps=3, N_flowfields=1)
+    dataset['x'][:] = 1.25
+    dataset['x'].encoding = {'dtype': 'int16', 'scale_factor': 0.01, '_FillValue': -999}
+
+    loaded_dataset = xr.open_dataset(writer.write(dataset, 'packed.nc'), mask_and_scale=False)
+    assert loaded_dataset['x'].dtype == np.int16
+    assert loaded_dataset['x'].attrs['scale_factor'] == 0.01
+    assert loaded_dataset['x'].attrs['_FillValue'] == -999
+    assert loaded_dataset['x'].encoding['zlib']
+    assert loaded_dataset['x'].values[0, 0] == 125
+    loaded_dataset.close()
@@ -19,6 +19,23 @@ def test_add_and_get_data():
     assert np.array_equal(data['y'], np.array([20.0, 21.0]))
 
 
+def test_add_batch():
+    """
+    Test adding a batch of data points, growing the buffer past its initial capacity.
+    """
+    buffer = SimulationDataBuffer(capacity=2)
+    buffer.add(0, 0.0, 0.0, 0.0)
+    buffer.add_batch(np.array([1, 2, 3]), 1.0, np.array([10.0, 11.0, 12.0]), np.array([20.0, 21.0, 22.0]))
+    assert len(buffer) == 4
+    assert buffer.capacity >= 4
+    assert buffer.nbytes == 4 * (4 + 8 + 8 + 8)
+    data = buffer.get_data()
+    assert np.array_equal(data['particle_id'], np.array([0, 1, 2, 3]))
+    assert np.array_equal(data['time'], np.array([0.0, 1.0, 1.0, 1.0]))
+    assert np.array_equal(data['x'], np.array([0.0, 10.0, 11.0, 12.0]))
+    assert np.array_equal(data['y'], np.array([0.0, 20.0, 21.0, 22.0]))
+
+
 def test_clear():
     """
     Test clearing the buffer.
@@ -131,6 +148,25 @@ def test_merge_output_files(tmp_path):
     assert len(ds.time) == 10  # Should have 10 time steps total
 
 
+@pytest.mark.parametrize('workers', [1, 2])
+def test_merge_output_files_keeps_chunk_order(tmp_path, workers):
+    """
+    Test that chunk files are concatenated in the order of their index, not their name,
+    also when they are read by worker processes.
+    """
+    writer = NetCDFWriter(tmp_path)
+    for chunk in range(12):
+        buffer = SimulationDataBuffer()
+        buffer.add(chunk, float(chunk), float(chunk), float(chunk))
+        buffer.write_to_disk(None, None, None, None, writer, f'.sim_buffer_{chunk}.nc')
+
+    SimulationDataBuffer.merge_output_files(writer.output_dir, 'merged_test.nc', workers=workers)
+
+    ds = xr.open_dataset(writer.output_dir / 'merged_test.nc')
+    assert ds.particle_id.values.tolist() == list(range(12))
+    ds.close()
+
+
 def test_merge_output_files_no_files(tmp_path):
     """
     Test that merge_output_files raises an error when no files are found.
@@ -138,3 +174,67 @@ def test_merge_output_files_no_files(tmp_path):
     # Use the EXACT error message including the period at the end
     with pytest.raises(FileNotFoundError, match='No .sim_buffer_\\*.nc files found to merge\\.'):
         SimulationDataBuffer.merge_output_files(tmp_path, 'merged_test.nc')
+
+
+def test_growth_capped_at_max_capacity():
+    """
+    Test that the buffer does not double past max_capacity and reuses its arrays after clear().
+    """
+    buf = SimulationDataBuffer(capacity=4, max_capacity=6)
+    for i in range(6):
+        buf.add(i, 0.0, 0.0, 0.0)
+    assert buf.capacity == 6
+    arrays = dict(buf.buffer)
+    buf.clear()
+    buf.add_batch(np.arange(6), 1.0, np.zeros(6), np.zeros(6))
+    assert all(buf.buffer[key] is arrays[key] for key in arrays)
+
+
+def test_growth_past_max_capacity_doubles():
+    """
+    Test that the buffer keeps doubling its capacity once it holds more than max_capacity.
+    """
+    buf = SimulationDataBuffer(capacity=4, max_capacity=6)
+    capacities = []
+    for i in range(25):
+        buf.add(i, 0.0, 0.0, 0.0)
+        capacities.append(buf.capacity)
+    assert sorted(set(capacities)) == [4, 6, 12, 24, 48]
+    assert buf.get_data()['particle_id'].tolist() == list(range(25))
+
+    buf = SimulationDataBuffer(capacity=4, max_capacity=6)
+    buf.add_batch(np.arange(7), 0.0, np.zeros(7), np.zeros(7))
+    assert buf.capacity == 8
+    buf.add_batch(np.arange(2), 0.0, np.zeros(2), np.zeros(2))
+    assert buf.capacity == 16
+
+
+def test_buffer_dtypes():
+    """
+    Test that particle IDs are buffered as int32, and positions and time in double precision.
+    """
+    buf = SimulationDataBuffer()
+    buf.add(1, 0.5, 1e6 + 0.123456, 20.0)
+    data = buf.get_data()
+    assert data['particle_id'].dtype == np.int32
+    assert data['time'].dtype == data['x'].dtype == data['y'].dtype == np.float64
+    assert data['x'][0] == 1e6 + 0.123456
+    assert SimulationDataBuffer.ROW_NBYTES == 28
+
+
+def test_append_to_zarr(tmp_path):
+    """
+    Test that buffers appended to a Zarr store are compressed with Blosc zstd and read back in order.
+    """
+    zarr = pytest.importorskip('zarr')
+    store = tmp_path / 'buffer.zarr'
+    buf = SimulationDataBuffer()
+    for chunk in range(2):
+        buf.add_batch(np.arange(3) + 3 * chunk, float(chunk), np.zeros(3), np.zeros(3))
+        buf.append_to_zarr(store)
+
+    ds = xr.open_zarr(store)
+    assert ds.particle_id.values.tolist() == list(range(6))
+    ds.close()
+    if int(zarr.__version__.split('.')[0]) >= 3:
+        assert 'zstd' in repr(zarr.open_array(store / 'x').compressors)
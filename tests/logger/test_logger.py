@@ -15,8 +15,15 @@ import tempfile
 import shutil
 import sys
 import logging
+import threading
 
-from sedtrails.logger.logger import setup_logging, log_simulation_state
+from sedtrails.logger.logger import (
+    setup_logging,
+    log_simulation_state,
+    flush_logging,
+    BufferedFileHandler,
+    CachedTimeFormatter,
+)
 
 LOG_FILENAME = "log.txt"
 
@@ -75,6 +82,7 @@ class TestLoggerBasicFunctionality(LoggerTestBase):
         except ValueError:
             logger.exception("Test Context")
 
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file), f"Log file not created at {log_file}"
         
@@ -97,6 +105,7 @@ class TestLoggerBasicFunctionality(LoggerTestBase):
         }
         log_simulation_state(logger, state_data)
         
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         
@@ -106,6 +115,25 @@ class TestLoggerBasicFunctionality(LoggerTestBase):
         assert "=== SIMULATION START ===" in log_content
         assert "Config: test.yaml" in log_content
         assert "Python: 3.9.7" in log_content
+        # The banner is one record, so only its first line has the record header
+        assert "\nConfig: test.yaml\n" in log_content
+
+    def test_log_simulation_state_dispatch(self):
+        """Test that aliased and unmapped states are logged by the right handler."""
+        setup_logging(self.test_results_dir)
+        logger = logging.getLogger(f"sedtrails.{__name__}")
+
+        log_simulation_state(logger, {"status": "particles_initialized", "count": 5, "position": (1, 2)})
+        log_simulation_state(logger, {"status": "custom_event", "value": 3})
+        flush_logging()
+
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            log_content = f.read()
+
+        assert "Created 5 particle(s)" in log_content
+        assert "Starting position: (1, 2)" in log_content
+        assert "Status: Custom Event" in log_content
+        assert "  value: 3" in log_content
 
     def test_multiple_exceptions_logged(self):
         """Test that multiple exceptions are properly logged."""
@@ -122,6 +150,7 @@ class TestLoggerBasicFunctionality(LoggerTestBase):
         except TypeError:
             logger.exception("Context 2")
         
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         
@@ -149,6 +178,7 @@ class TestLoggerBasicFunctionality(LoggerTestBase):
         except ValueError:
             logger.exception("Traceback Test")
         
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         
@@ -174,6 +204,7 @@ class TestGlobalExceptionHandling(LoggerTestBase):
         # Simulate an unhandled exception
         sys.excepthook(RuntimeError, RuntimeError("Global test error"), None)
 
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         with open(log_file, encoding='utf-8') as f:
@@ -189,6 +220,7 @@ class TestGlobalExceptionHandling(LoggerTestBase):
         test_exception = RuntimeError("Simulation failed")
         sys.excepthook(RuntimeError, test_exception, None)
         
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         
@@ -207,6 +239,7 @@ class TestLoggerConfiguration(LoggerTestBase):
         """Test that logger initialization writes its startup messages."""
         setup_logging(self.test_results_dir)
         
+        flush_logging()
         log_file = os.path.join(self.test_results_dir, LOG_FILENAME)
         assert os.path.exists(log_file)
         
@@ -216,6 +249,29 @@ class TestLoggerConfiguration(LoggerTestBase):
         assert "=== LOGGING INITIALIZED ===" in log_content
         assert "Log file:" in log_content  # setup_logging logs the file path
 
+    def test_setup_logging_idempotent(self):
+        """Test that setting up the same configuration again keeps the handlers and the log file."""
+        logger = setup_logging(self.test_results_dir)
+        handlers = list(logger.handlers)
+        logger.info("Before second setup")
+
+        assert setup_logging(self.test_results_dir) is logger
+        assert logger.handlers == handlers
+        flush_logging()
+
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            assert "Before second setup" in f.read()
+
+        # A different level is a new configuration
+        setup_logging(self.test_results_dir, level='DEBUG')
+        assert logger.handlers != handlers
+        assert logger.level == logging.DEBUG
+        flush_logging()
+
+        # which keeps logging to the same file
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            assert "Before second setup" in f.read()
+
     def test_logger_directory_created(self):
         """Test that setup_logging creates the directory if it does not exist."""
         non_existent_dir = os.path.join(self.temp_dir, 'does_not_exist')
@@ -225,6 +281,104 @@ class TestLoggerConfiguration(LoggerTestBase):
 
         # Should not raise; it should create the directory and log file
         setup_logging(non_existent_dir)
+        flush_logging()
         log_file = os.path.join(non_existent_dir, LOG_FILENAME)
         assert os.path.exists(non_existent_dir)
-        assert os.path.exists(log_file)
\ No newline at end of file
+        assert os.path.exists(log_file)
+
+class TestBackgroundLogging(LoggerTestBase):
+    """Test that records are written by a background thread."""
+
+    def test_records_written_by_listener(self):
+        """Test that the logger only holds the queue handler and that flushing writes all records."""
+        logger = setup_logging(self.test_results_dir)
+        assert [type(h).__name__ for h in logger.handlers] == ["QueueListenerHandler"]
+
+        for i in range(100):
+            logging.getLogger(f"sedtrails.{__name__}").info("Record %d", i)
+        flush_logging()
+
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            log_content = f.read()
+        assert "Record 0" in log_content
+        assert "Record 99" in log_content
+
+    def test_concurrent_flushes(self):
+        """Test that flushing from several threads at once keeps a single listener and writes all records."""
+        logger = setup_logging(self.test_results_dir)
+        sedtrails_logger = logging.getLogger(f"sedtrails.{__name__}")
+
+        def log_and_flush(thread):
+            for i in range(20):
+                sedtrails_logger.info("Thread %d record %d", thread, i)
+                flush_logging()
+
+        listener_thread = logger.handlers[0].listener._thread
+        threads = [threading.Thread(target=log_and_flush, args=(thread,)) for thread in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Flushing drains the queue without restarting the listener thread
+        assert logger.handlers[0].listener._thread is listener_thread
+        assert listener_thread.is_alive()
+        assert len([t for t in threading.enumerate() if t.name.endswith("(_monitor)")]) == 1
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            log_content = f.read()
+        assert all(f"Thread {thread} record 19" in log_content for thread in range(4))
+
+    def test_other_handlers_get_unchanged_record(self):
+        """Test that queueing a record does not change the record seen by the other handlers of the logger."""
+        logger = setup_logging(self.test_results_dir)
+        records = []
+        capture = logging.Handler()
+        capture.emit = records.append
+        logger.addHandler(capture)
+        try:
+            logging.getLogger(f"sedtrails.{__name__}").info("Record %d of %s", 1, "test")
+        finally:
+            logger.removeHandler(capture)
+        flush_logging()
+
+        assert records[0].msg == "Record %d of %s"
+        assert records[0].args == (1, "test")
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            assert "Record 1 of test" in f.read()
+
+    def test_buffered_file_handler(self):
+        """Test that the buffered file handler only writes records to the file when flushed."""
+        log_file = os.path.join(self.test_results_dir, "buffered.txt")
+        handler = BufferedFileHandler(log_file, mode='w')
+        handler.handle(logging.makeLogRecord({"msg": "Buffered record"}))
+        assert os.path.getsize(log_file) == 0
+
+        handler.flush()
+        with open(log_file, 'r', encoding='utf-8') as f:
+            assert f.read() == "Buffered record\n"
+        handler.close()
+
+    def test_log_simulation_state_below_level(self):
+        """Test that states logged below the configured level are skipped, and that messages keep their arguments."""
+        setup_logging(self.test_results_dir, level='INFO')
+        logger = logging.getLogger(f"sedtrails.{__name__}")
+
+        position = [1.0, 2.0]
+        log_simulation_state(logger, {"status": "simulation_progress", "step": 1}, level=logging.DEBUG)
+        log_simulation_state(logger, {"status": "simulation_progress", "progress_pct": 50, "position": position})
+        position[0] = 3.0  # changing the argument after logging does not change the record
+        flush_logging()
+
+        with open(os.path.join(self.test_results_dir, LOG_FILENAME), 'r', encoding='utf-8') as f:
+            log_content = f.read()
+
+        assert "(step 1)" not in log_content
+        assert "Progress: 50% (step 0) at [1.0, 2.0]" in log_content
+
+    def test_cached_time_formatter(self):
+        """Test that the cached time formatter formats times as logging.Formatter does."""
+        cached = CachedTimeFormatter('%(asctime)s %(message)s')
+        plain = logging.Formatter('%(asctime)s %(message)s')
+        for created in (1700000000.123, 1700000000.987, 1700000001.5):
+            record = logging.makeLogRecord({"msg": "Record", "created": created, "msecs": (created % 1) * 1000})
+            assert cached.format(record) == plain.format(record)
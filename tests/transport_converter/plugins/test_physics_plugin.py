@@ -91,3 +91,26 @@ def test_plugin_add_physics_accepts_sedtrails_data(plugin_class):
     assert params[1].name == 'sedtrails_data', (
         f"add_physics method in {plugin_file} should take `sedtrails_data` as second parameter, got '{params[1].name}'"
     )
+
+
+@pytest.mark.parametrize('tracer_method', ['vanwesten', 'soulsby', 'bertin'])
+def test_get_physics_plugin(tracer_method):
+    """
+    Test that each tracer method resolves to its PhysicsPlugin class.
+    """
+    from sedtrails.transport_converter.physics_converter import get_physics_plugin
+
+    plugin_class = get_physics_plugin(tracer_method)
+    assert plugin_class.__name__ == 'PhysicsPlugin'
+    assert plugin_class.__module__ == f'sedtrails.transport_converter.plugins.physics.{tracer_method}'
+    assert issubclass(plugin_class, BasePhysicsPlugin)
+
+
+def test_get_physics_plugin_unknown_method():
+    """
+    Test that an unknown tracer method raises an ImportError.
+    """
+    from sedtrails.transport_converter.physics_converter import get_physics_plugin
+
+    with pytest.raises(ImportError, match='Failed to import physics plugin module'):
+        get_physics_plugin('not_a_method')